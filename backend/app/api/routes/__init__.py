@@ -1,10 +1,12 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, user, stock, watchlist
+from app.api.routes import auth, user, stock, watchlist, health, jobs
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["authentication"])
 api_router.include_router(user.router, prefix="/users", tags=["users"])
 api_router.include_router(stock.router, prefix="/stocks", tags=["stocks"])
-api_router.include_router(watchlist.router, prefix="/watchlist", tags=["watchlist"])
\ No newline at end of file
+api_router.include_router(watchlist.router, prefix="/watchlist", tags=["watchlist"])
+api_router.include_router(jobs.router, prefix="/jobs", tags=["jobs"])
+api_router.include_router(health.router, prefix="/health", tags=["health"])
\ No newline at end of file
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.startup import startup_state
+
+router = APIRouter()
+
+@router.get("")
+async def health():
+    """Overall service health, including startup progress"""
+    return {"status": "ok" if startup_state.ready else "starting", **startup_state.report()}
+
+@router.get("/live")
+async def liveness():
+    """The process is up and serving requests"""
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness():
+    """The database is migrated and caches/models are warm"""
+    report = startup_state.report()
+    return JSONResponse(status_code=200 if report["ready"] else 503, content=report)
@@ -0,0 +1,75 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_active_user
+from app.core.config import settings
+from app.db.database import get_db
+from app.db.models import Job, User
+from app.jobs.queue import enqueue_job, request_cancel
+from app.jobs.tasks import JOB_TYPES
+from app.schemas.schemas import JobCreate, JobResponse
+
+router = APIRouter()
+
+# Users only see their own jobs; admins see every job, including internal ones
+def _get_job_or_404(db: Session, job_id: int, user: User) -> Job:
+    job = db.get(Job, job_id)
+    if not job or not (user.is_admin or job.user_id == user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job
+
+@router.post("/", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_job(
+    job_data: JobCreate,
+    response: Response,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Queue a background job; repeating an idempotency key returns the original job"""
+    if job_data.job_type not in JOB_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid job type. Must be one of {sorted(JOB_TYPES)}"
+        )
+
+    if job_data.priority > settings.JOB_MAX_USER_PRIORITY and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Priority above {settings.JOB_MAX_USER_PRIORITY} requires an admin"
+        )
+
+    job = enqueue_job(
+        db,
+        job_data.job_type,
+        payload=job_data.payload,
+        priority=job_data.priority,
+        idempotency_key=job_data.idempotency_key,
+        max_attempts=job_data.max_attempts,
+        user_id=current_user.id
+    )
+    if job.user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Idempotency key already used"
+        )
+    response.headers["Location"] = f"{settings.API_V1_STR}/jobs/{job.id}"
+    return job
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: int, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+    """Get job status and progress"""
+    return _get_job_or_404(db, job_id, current_user)
+
+@router.post("/{job_id}/cancel", response_model=JobResponse)
+async def cancel_job(job_id: int, current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)):
+    """Cancel a queued job, or ask a running one to stop"""
+    job = _get_job_or_404(db, job_id, current_user)
+    if job.status not in ("queued", "running"):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Job already {job.status}"
+        )
+    return request_cancel(db, job)
@@ -1,34 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import date, datetime, timedelta
+import base64
 import random
 
 from app.core.auth import get_current_active_user
 from app.db.database import get_db
 from app.db.models import User, StockData, PredictionResult, ModelMetrics
-from app.schemas.schemas import StockHistoricalData, PredictionResponse, ModelMetricsResponse
+from app.schemas.schemas import (
+    StockHistoricalData, PredictionResponse, ModelMetricsResponse, ScreenRequest, ScreenResponse,
+    PredictionLogPage, StockHistorySeries
+)
+from app.core.cache import cache
+from app.core.compression import cached_json_response
 from app.core.config import settings
 
 # In a real implementation, these would be replaced with actual model predictions
-from app.models.mock_data import generate_mock_historical_data, generate_mock_prediction, generate_mock_metrics
+from app.models.mock_data import (
+    HISTORY_RANGE_DAYS, MOCK_STOCKS, generate_mock_bar_series, generate_mock_prediction, generate_mock_metrics
+)
 
 router = APIRouter()
 
 @router.get("/history", response_model=List[dict])
 async def get_stock_history(
+    request: Request,
     ticker: str,
-    range: str = "1y",
+    range: str = Query("1y", description=f"One of {list(HISTORY_RANGE_DAYS)}"),
+    start: Optional[date] = Query(
+        None,
+        description=f"First bar date to include; overrides range. At most {HISTORY_RANGE_DAYS['all']} days back"
+    ),
+    end: Optional[date] = Query(None, description="Last bar date to include"),
+    after_date: Optional[date] = Query(None, description="Only bars strictly after this date, e.g. the newest bar already held"),
     db: Session = Depends(get_db)
 ):
     """Get historical stock data"""
-    # In a real implementation, this would fetch data from the database or an external API
-    # For now, we'll generate mock data
-    historical_data = generate_mock_historical_data(ticker, range)
-    
-    return historical_data
+    # Validate range; it is part of the cache key, so unknown values must not reach the cache
+    if range not in HISTORY_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Invalid range. Must be one of {list(HISTORY_RANGE_DAYS)}")
+    # An explicit start reads from the full "all" series, so it can't reach past what that holds
+    earliest = date.today() - timedelta(days=HISTORY_RANGE_DAYS["all"])
+    if start and start < earliest:
+        raise HTTPException(status_code=400, detail=f"start must be on or after {earliest.isoformat()}")
+
+    # Imported here so importing the app doesn't load NumPy
+    from app.models.bars import BarSeries
+
+    ticker = ticker.upper()
+    period = "all" if start else range
+
+    def load_series() -> BarSeries:
+        # In a real implementation, this would fetch data from the database or an external API
+        # For now, we'll generate mock data
+        return StockHistorySeries(ticker=ticker, bars=generate_mock_bar_series(ticker, period)).bars
+
+    # Both forms are shared by all workers until the ticker's data changes
+    scope = f"ticker:{ticker}"
+    if start or end or after_date:
+        # Windows vary per client, so cache the compact binary series and cut it per request
+        def load_window() -> bytes:
+            key = cache.versioned_key(scope, "bars", period)
+            data = cache.get_or_fill(key, lambda: load_series().to_bytes(), settings.CACHE_TTL_SECONDS)
+            return BarSeries.from_bytes(ticker, data).slice(start, end, after_date).to_json()
+
+        body = await run_in_threadpool(load_window)
+        return Response(content=body, media_type="application/json")
+
+    return await cached_json_response(request, scope, ("history", period), lambda: load_series().to_json())
 
 @router.get("/predict", response_model=PredictionResponse)
 async def get_stock_prediction(
+    request: Request,
     ticker: str,
     horizon: str = "1d",
     models: str = "xgboost,lstm,ma_crossover",
@@ -39,14 +85,66 @@ async def get_stock_prediction(
     if horizon not in settings.PREDICTION_HORIZON:
         raise HTTPException(status_code=400, detail=f"Invalid horizon. Must be one of {settings.PREDICTION_HORIZON}")
     
-    # Parse requested models
-    model_list = models.split(",")
-    
-    # In a real implementation, this would use actual ML models to make predictions
-    # For now, we'll generate mock predictions
-    prediction = generate_mock_prediction(ticker, horizon, model_list)
-    
-    return prediction
+    # Parse requested models; order and repeats don't matter, so the cache key doesn't depend on them
+    model_list = sorted({model.strip() for model in models.split(",") if model.strip()})
+    unknown = [model for model in model_list if model not in settings.PREDICTION_MODELS]
+    if not model_list or unknown:
+        raise HTTPException(status_code=400, detail=f"Invalid models. Must be some of {settings.PREDICTION_MODELS}")
+    ticker = ticker.upper()
+
+    def fill() -> bytes:
+        # In a real implementation, this would use actual ML models to make predictions
+        # For now, we'll generate mock predictions
+        prediction = generate_mock_prediction(ticker, horizon, model_list)
+        return PredictionResponse(**prediction).model_dump_json().encode()
+
+    return await cached_json_response(request, "predictions", (ticker, horizon, ",".join(model_list)), fill)
+
+def _encode_cursor(prediction_date: datetime, prediction_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{prediction_date.isoformat()}|{prediction_id}".encode()).decode()
+
+def _decode_cursor(cursor: str):
+    try:
+        prediction_date, prediction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(prediction_date), int(prediction_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/predictions", response_model=PredictionLogPage)
+async def get_prediction_log(
+    ticker: str,
+    horizon: str = "1d",
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Page through stored predictions for a ticker, newest first"""
+    if horizon not in settings.PREDICTION_HORIZON:
+        raise HTTPException(status_code=400, detail=f"Invalid horizon. Must be one of {settings.PREDICTION_HORIZON}")
+
+    query = db.query(PredictionResult).filter(
+        PredictionResult.ticker == ticker.upper(),
+        PredictionResult.horizon == horizon
+    )
+    # Keyset pagination: seek past the last row of the previous page instead of using OFFSET,
+    # so every page is a short range scan on the (ticker, horizon, prediction_date) index
+    if cursor:
+        last_date, last_id = _decode_cursor(cursor)
+        query = query.filter(or_(
+            PredictionResult.prediction_date < last_date,
+            and_(PredictionResult.prediction_date == last_date, PredictionResult.id < last_id)
+        ))
+    rows = query.order_by(
+        PredictionResult.prediction_date.desc(),
+        PredictionResult.id.desc()
+    ).limit(limit + 1).all()
+
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = _encode_cursor(items[-1].prediction_date, items[-1].id)
+
+    return {"items": items, "next_cursor": next_cursor}
 
 @router.get("/metrics", response_model=ModelMetricsResponse)
 async def get_model_metrics(
@@ -60,28 +158,49 @@ async def get_model_metrics(
     
     return metrics
 
+@router.post("/screen", response_model=ScreenResponse)
+async def screen_stocks(request: ScreenRequest):
+    """Filter and rank the whole ticker universe in one pass"""
+    # Imported here so the screener only loads in workers that screen (startup warm-up preloads it)
+    from app.models.screener import UNIVERSE_FIELDS, universe, load_shared_universe
+
+    # Validate fields up front so a typo doesn't silently match nothing
+    fields = [f.field for f in request.filters]
+    if request.sort:
+        fields.append(request.sort.field)
+    unknown = [field for field in fields if field not in UNIVERSE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown screen fields {unknown}. Must be one of {list(UNIVERSE_FIELDS)}")
+
+    # Picks up a universe republished by another worker since our last screen
+    await run_in_threadpool(load_shared_universe)
+
+    total, results, snapshot = universe.screen(
+        filters=[(f.field, f.op, f.value) for f in request.filters],
+        sort_by=request.sort.field if request.sort else None,
+        descending=request.sort is None or request.sort.order == "desc",
+        offset=request.offset,
+        limit=request.limit,
+    )
+
+    return {
+        "total": total,
+        "offset": request.offset,
+        "limit": request.limit,
+        "as_of": snapshot.as_of,
+        "results": results
+    }
+
 @router.get("/search")
 async def search_stocks(query: str, limit: int = 10):
     """Search for stocks by ticker or name"""
     # In a real implementation, this would search a database of stocks
     # For now, we'll return some mock results
-    mock_results = [
-        {"ticker": "AAPL", "name": "Apple Inc."},
-        {"ticker": "MSFT", "name": "Microsoft Corporation"},
-        {"ticker": "GOOGL", "name": "Alphabet Inc."},
-        {"ticker": "AMZN", "name": "Amazon.com Inc."},
-        {"ticker": "TSLA", "name": "Tesla, Inc."},
-        {"ticker": "META", "name": "Meta Platforms, Inc."},
-        {"ticker": "NVDA", "name": "NVIDIA Corporation"},
-        {"ticker": "NFLX", "name": "Netflix, Inc."},
-        {"ticker": "PYPL", "name": "PayPal Holdings, Inc."},
-        {"ticker": "INTC", "name": "Intel Corporation"}
-    ]
     
     # Filter results based on query
     filtered_results = []
     query = query.upper()
-    for stock in mock_results:
+    for stock in MOCK_STOCKS:
         if query in stock["ticker"] or query.lower() in stock["name"].lower():
             filtered_results.append(stock)
     
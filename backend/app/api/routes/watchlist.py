@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -36,7 +37,15 @@ async def add_to_watchlist(item: WatchlistItemCreate, current_user: User = Depen
         ticker=item.ticker.upper()
     )
     db.add(db_item)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request added the same ticker first
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Stock already in watchlist"
+        )
     db.refresh(db_item)
     
     return db_item
@@ -0,0 +1,392 @@
+import hashlib
+import io
+import logging
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from urllib.parse import urlparse
+
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: counters fall back to unlocked read-modify-write
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """Size-bounded LRU cache private to this process"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires and expires < time.time():
+                self._remove(key)
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and not (item[1] and item[1] < time.time()):
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def delete(self, key: str):
+        with self._lock:
+            self._remove(key)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            item = self._items.get(key)
+            value = int(item[0]) + 1 if item else 1
+            self._store(key, str(value).encode(), None)
+            return value
+
+    def _store(self, key: str, value: bytes, ttl: Optional[float]):
+        self._remove(key)
+        self._items[key] = (value, time.time() + ttl if ttl else 0.0)
+        self.size += len(value)
+        while self.size > self.max_bytes and len(self._items) > 1:
+            self._remove(next(iter(self._items)))
+
+    def _remove(self, key: str):
+        item = self._items.pop(key, None)
+        if item is not None:
+            self.size -= len(item[0])
+
+
+class FileCacheBackend:
+    """One file per key in a directory shared by every worker on the host
+
+    Point CACHE_DIR at a tmpfs such as /dev/shm to keep entries in shared memory.
+    Entries are written to a temp file and renamed into place, so readers never
+    see partial values. Eviction drops the least recently used files once the
+    directory grows past max_bytes.
+    """
+
+    HEADER = struct.Struct("!d")  # expiry timestamp, 0 for none
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._written = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest())
+
+    def _read(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        if len(data) < self.HEADER.size:
+            return None
+        (expires,) = self.HEADER.unpack_from(data)
+        if expires and expires < time.time():
+            self._unlink(path)
+            return None
+        return data[self.HEADER.size:]
+
+    def _unlink(self, path: str):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        value = self._read(path)
+        if value is not None:
+            try:
+                os.utime(path)  # mtime doubles as the LRU clock
+            except FileNotFoundError:
+                pass
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(self.HEADER.pack(time.time() + ttl if ttl else 0.0))
+            f.write(value)
+        os.replace(tmp_path, self._path(key))
+
+        # Scan for eviction every so often rather than on every write
+        self._written += len(value)
+        if self._written > self.max_bytes // 16:
+            self._written = 0
+            self.evict()
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        path = self._path(key)
+        for _ in range(2):
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                # Expired entries (e.g. a lock left by a crashed worker) are removed by _read
+                if self._read(path) is not None:
+                    return False
+                continue
+            with os.fdopen(fd, "wb") as f:
+                f.write(self.HEADER.pack(time.time() + ttl if ttl else 0.0))
+                f.write(value)
+            return True
+        return False
+
+    def delete(self, key: str):
+        self._unlink(self._path(key))
+
+    def incr(self, key: str) -> int:
+        with open(os.path.join(self.directory, ".counters.lock"), "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            value = int(self.get(key) or 0) + 1
+            self.set(key, str(value).encode())
+            return value
+
+    def evict(self):
+        entries = []
+        total = 0
+        now = time.time()
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                # Leave in-progress writes alone unless they were abandoned
+                if entry.name.endswith(".tmp") and now - stat.st_mtime < 60:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            self._unlink(path)
+            total -= size
+
+
+class RedisCacheBackend:
+    """Minimal RESP client for Redis or any server speaking its protocol
+
+    Size-bounded eviction is left to the server (maxmemory with an LRU policy).
+    """
+
+    def __init__(self, url: str, timeout: float = 1.0):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self):
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._local.sock = sock
+        self._local.reader = sock.makefile("rb")
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", self.db)
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+        self._local.sock = None
+
+    def _send(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+        self._local.sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._local.reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by cache server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload.decode()
+        if kind == b"-":
+            raise RuntimeError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length < 0:
+                return None
+            return self._local.reader.read(length + 2)[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length < 0 else [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected reply from cache server: {line!r}")
+
+    def _command(self, *args):
+        # Retry once on a fresh connection, e.g. after the server restarted
+        for attempt in range(2):
+            try:
+                if getattr(self._local, "sock", None) is None:
+                    self._connect()
+                return self._send(*args)
+            except (OSError, ConnectionError):
+                self._close()
+                if attempt:
+                    raise
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command("GET", key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if ttl:
+            self._command("SET", key, value, "PX", int(ttl * 1000))
+        else:
+            self._command("SET", key, value)
+
+    def add(self, key: str, value: bytes, ttl: Optional[float] = None) -> bool:
+        if ttl:
+            return self._command("SET", key, value, "NX", "PX", int(ttl * 1000)) is not None
+        return self._command("SET", key, value, "NX") is not None
+
+    def delete(self, key: str):
+        self._command("DEL", key)
+
+    def incr(self, key: str) -> int:
+        return self._command("INCR", key)
+
+
+class SharedCache:
+    """Versioned, stampede-protected cache over a pluggable backend"""
+
+    def __init__(self, backend, prefix: str = "stock-api"):
+        self.backend = backend
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def version(self, scope: str) -> int:
+        value = self.backend.get(self._key(f"version:{scope}"))
+        return int(value) if value else 0
+
+    def bump_version(self, scope: str) -> int:
+        """Invalidate every key built from `scope`, e.g. after new data for a ticker lands"""
+        return self.backend.incr(self._key(f"version:{scope}"))
+
+    def versioned_key(self, scope: str, *parts) -> str:
+        return ":".join([scope, f"v{self.version(scope)}", *map(str, parts)])
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.backend.get(self._key(key))
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        self.backend.set(self._key(key), value, ttl)
+
+    def get_or_fill(
+        self,
+        key: str,
+        fill: Callable[[], bytes],
+        ttl: Optional[float] = None,
+        lock_ttl: float = 30.0,
+        wait: float = 10.0
+    ) -> bytes:
+        """Return the cached value, computing it with `fill` in at most one worker at a time"""
+        full_key = self._key(key)
+        value = self.backend.get(full_key)
+        if value is not None:
+            return value
+
+        lock_key = self._key(f"lock:{key}")
+        deadline = time.monotonic() + wait
+        delay = 0.005
+        while True:
+            if self.backend.add(lock_key, b"1", lock_ttl):
+                try:
+                    # Another worker may have finished between our miss and taking the lock
+                    value = self.backend.get(full_key)
+                    if value is None:
+                        value = fill()
+                        self.backend.set(full_key, value, ttl)
+                    return value
+                finally:
+                    self.backend.delete(lock_key)
+
+            # Someone else is filling this key; wait for their result
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+            value = self.backend.get(full_key)
+            if value is not None:
+                return value
+            if time.monotonic() > deadline:
+                # The filler is stuck or gone; compute without caching rather than fail
+                return fill()
+
+
+def dump_arrays(**arrays) -> bytes:
+    """Serialize NumPy arrays for caching (no pickling)"""
+    import numpy as np
+
+    buffer = io.BytesIO()
+    np.savez(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def load_arrays(data: bytes) -> dict:
+    import numpy as np
+
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def create_cache_backend():
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCacheBackend(settings.CACHE_REDIS_URL)
+    if settings.CACHE_BACKEND == "file":
+        return FileCacheBackend(settings.CACHE_DIR, settings.CACHE_MAX_BYTES)
+    logger.warning(
+        "CACHE_BACKEND=memory keeps a separate cache per process; versions bumped by other "
+        "workers or the job runner are not seen here, so only use it for single-process development"
+    )
+    return MemoryCacheBackend(settings.CACHE_MAX_BYTES)
+
+
+# Shared cache used by the stock routes
+cache = SharedCache(create_cache_backend())
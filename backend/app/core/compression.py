@@ -0,0 +1,185 @@
+import gzip
+from typing import Callable, Dict, Optional, Sequence
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.cache import cache
+from app.core.config import settings
+
+# Optional codecs; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Codec levels for each compression profile. Cached variants are compressed once, so they
+# can afford "max"; bodies the middleware compresses on every request should stay on "fast".
+PROFILE_LEVELS: Dict[str, Dict[str, int]] = {
+    "fast": {"gzip": 1, "br": 1, "zstd": 1},
+    "balanced": {"gzip": 6, "br": 5, "zstd": 3},
+    "max": {"gzip": 9, "br": 9, "zstd": 12},
+}
+
+
+def available_encodings():
+    """Supported encodings in server preference order"""
+    encodings = []
+    if zstandard is not None:
+        encodings.append("zstd")
+    if brotli is not None:
+        encodings.append("br")
+    encodings.append("gzip")
+    return encodings
+
+
+ENCODINGS = available_encodings()
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Pick the preferred encoding the client accepts (q > 0), or None for identity"""
+    if not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    wildcard = accepted.get("*", 0.0)
+    for encoding in ENCODINGS:
+        if accepted.get(encoding, wildcard) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str, profile: str = "balanced") -> bytes:
+    level = PROFILE_LEVELS[profile][encoding]
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(body)
+    if encoding == "br":
+        return brotli.compress(body, quality=level)
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+def route_profile(path: str) -> str:
+    """Profile for bodies compressed per request on this route"""
+    route = path[len(settings.API_V1_STR):] if path.startswith(settings.API_V1_STR) else path
+    return settings.COMPRESSION_ROUTE_PROFILES.get(route.rstrip("/"), settings.COMPRESSION_DEFAULT_PROFILE)
+
+
+async def compress_async(body: bytes, encoding: str, profile: str) -> bytes:
+    """Compress on the event loop for small bodies, in a worker thread for large ones"""
+    if len(body) >= settings.COMPRESSION_THREAD_THRESHOLD:
+        return await run_in_threadpool(compress, body, encoding, profile)
+    return compress(body, encoding, profile)
+
+
+async def cached_json_response(
+    request: Request, scope: str, parts: Sequence, fill: Callable[[], bytes]
+) -> Response:
+    """Serve a cached JSON body, plus a cached pre-compressed variant for the client's encoding
+
+    The body is cached under cache.versioned_key(scope, *parts). Each variant is compressed
+    once per cache entry and shared through the cache like the body itself, so the
+    compression middleware has nothing left to do.
+    """
+    def load():
+        # Resolving the version is a cache read too, so it stays off the event loop
+        key = cache.versioned_key(scope, *parts)
+        return key, cache.get_or_fill(key, fill, settings.CACHE_TTL_SECONDS)
+
+    key, body = await run_in_threadpool(load)
+    encoding = negotiate(request.headers.get("accept-encoding")) if settings.COMPRESSION_ENABLED else None
+    if encoding is None or len(body) < settings.COMPRESSION_MIN_SIZE:
+        return Response(content=body, media_type="application/json", headers={"Vary": "Accept-Encoding"})
+
+    compressed = await run_in_threadpool(
+        cache.get_or_fill,
+        f"{key}:{encoding}",
+        lambda: compress(body, encoding, settings.COMPRESSION_CACHED_PROFILE),
+        settings.CACHE_TTL_SECONDS
+    )
+    return Response(
+        content=compressed,
+        media_type="application/json",
+        headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+    )
+
+
+def _add_vary(headers: MutableHeaders):
+    vary = headers.get("vary", "")
+    if "accept-encoding" not in vary.lower():
+        headers.add_vary_header("Accept-Encoding")
+
+
+class CompressionMiddleware:
+    """Compress JSON/text responses using the best encoding the client accepts"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = route_profile(scope["path"])
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                # Hold the headers until we know whether the body gets compressed
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start_message["headers"])
+            body = message.get("body", b"")
+            compressible = (
+                "content-encoding" not in headers
+                and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                and start_message["status"] not in (204, 304)
+            )
+            # Streaming bodies and small or already-encoded responses go out untouched
+            if message.get("more_body", False) or not compressible or len(body) < settings.COMPRESSION_MIN_SIZE:
+                passthrough = True
+                if compressible:
+                    _add_vary(headers)
+                start_message["headers"] = headers.raw
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = await compress_async(body, encoding, profile)
+            _add_vary(headers)
+            if len(compressed) < len(body):
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(compressed))
+                body = compressed
+            start_message["headers"] = headers.raw
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,6 +1,6 @@
 import os
 from pydantic_settings import BaseSettings
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 class Settings(BaseSettings):
     # API settings
@@ -13,6 +13,69 @@ class Settings(BaseSettings):
     # Database settings
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./stock_prediction.db")
     
+    # Resolved predictions older than this are rolled up into monthly summaries
+    PREDICTION_RETENTION_DAYS: int = int(os.getenv("PREDICTION_RETENTION_DAYS", "365"))
+    
+    # Startup settings
+    # "auto": each worker runs migrations/seeding under a file lock, so only one does the work
+    # "external": schema and seed data are managed by `python -m app.db.init_db` before workers start
+    STARTUP_MODE: str = os.getenv("STARTUP_MODE", "auto")
+    STARTUP_LOCK_FILE: str = os.getenv("STARTUP_LOCK_FILE", "./.startup.lock")
+    STARTUP_BUDGET_SECONDS: float = float(os.getenv("STARTUP_BUDGET_SECONDS", "5.0"))
+    
+    # Rate limiting: (requests per minute, burst) per user or client IP, per route class
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_BACKEND: str = os.getenv("RATE_LIMIT_BACKEND", "memory")  # "memory" or "sqlite" (shared by workers)
+    RATE_LIMIT_SQLITE_PATH: str = os.getenv("RATE_LIMIT_SQLITE_PATH", "./.rate_limit.db")
+    RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+        "cheap": (300, 60),
+        "expensive": (30, 10),
+    }
+    RATE_LIMIT_EXPENSIVE_ROUTES: List[str] = [
+        "/stocks/predict", "/stocks/screen", "/auth/login", "/auth/register", "/jobs"
+    ]
+    # Still served when lower-priority work is being shed
+    RATE_LIMIT_HIGH_PRIORITY_ROUTES: List[str] = ["/auth/login", "/auth/register", "/users/me"]
+    MAX_CONCURRENT_REQUESTS: int = int(os.getenv("MAX_CONCURRENT_REQUESTS", "64"))
+    
+    # Shared response/array cache: "file" (shared by workers and job processes on a host),
+    # "redis" (shared across hosts; any server speaking the Redis protocol) or "memory"
+    # (per process, single-process dev only: invalidations from job workers never reach the API)
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "file")
+    CACHE_DIR: str = os.getenv(
+        "CACHE_DIR", "/dev/shm/stock-api-cache" if os.path.isdir("/dev/shm") else "./.cache"
+    )
+    CACHE_REDIS_URL: str = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    CACHE_MAX_BYTES: int = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "300"))
+    
+    # Background jobs
+    JOB_WORKER_PROCESSES: int = int(os.getenv("JOB_WORKER_PROCESSES", "2"))
+    JOB_POLL_INTERVAL_SECONDS: float = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", "1.0"))
+    # Highest priority a non-admin user may give a job; internal jobs are queued at 0
+    JOB_MAX_USER_PRIORITY: int = int(os.getenv("JOB_MAX_USER_PRIORITY", "0"))
+    JOB_RETRY_BACKOFF_SECONDS: float = float(os.getenv("JOB_RETRY_BACKOFF_SECONDS", "10"))
+    # Workers refresh a running job's heartbeat this often; jobs without one for
+    # JOB_STALE_AFTER_SECONDS are assumed lost (e.g. the worker crashed) and requeued
+    JOB_HEARTBEAT_SECONDS: float = float(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+    JOB_STALE_AFTER_SECONDS: int = int(os.getenv("JOB_STALE_AFTER_SECONDS", "600"))
+    
+    # Response compression (gzip always; brotli/zstd when those packages are installed)
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    # Bodies at least this large are compressed in a worker thread, off the event loop
+    COMPRESSION_THREAD_THRESHOLD: int = int(os.getenv("COMPRESSION_THREAD_THRESHOLD", str(64 * 1024)))
+    # Pre-compressed variants of cached responses are compressed once per cache entry
+    COMPRESSION_CACHED_PROFILE: str = "max"
+    COMPRESSION_DEFAULT_PROFILE: str = "balanced"
+    # "fast", "balanced" or "max" per route for bodies the middleware compresses on every
+    # request, e.g. windowed history; cached responses use COMPRESSION_CACHED_PROFILE
+    COMPRESSION_ROUTE_PROFILES: Dict[str, str] = {
+        "/stocks/history": "fast",
+        "/stocks/screen": "fast",
+        "/stocks/predictions": "fast",
+    }
+    
     # JWT settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-for-jwt-please-change-in-production")
     ALGORITHM: str = "HS256"
@@ -25,6 +88,7 @@ class Settings(BaseSettings):
     # Model settings
     MODEL_DIR: str = "./app/models/saved"
     PREDICTION_HORIZON: List[str] = ["1d", "5d"]
+    PREDICTION_MODELS: List[str] = ["xgboost", "lstm", "gru", "arima", "ma_crossover"]
     TARGET_ACCURACY: str = "~70%"
     
     class Config:
@@ -0,0 +1,221 @@
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Request priorities; lower-priority work is shed first when the server is busy
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Fraction of MAX_CONCURRENT_REQUESTS each priority may fill before it is shed
+PRIORITY_SHED_AT = {
+    PRIORITY_HIGH: 1.0,
+    PRIORITY_NORMAL: 0.9,
+    PRIORITY_LOW: 0.75,
+}
+
+
+class MemoryBucketBackend:
+    """Token buckets held in this process"""
+
+    # take() never does I/O, so it runs inline on the event loop
+    blocking = False
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        """Take `cost` tokens, returning 0 if allowed or the seconds until enough tokens refill"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / rate
+            if len(self._buckets) >= self.max_keys and key not in self._buckets:
+                self._evict(now, capacity / rate)
+            self._buckets[key] = (tokens, now)
+        return wait
+
+    def _evict(self, now: float, refill_seconds: float):
+        # Buckets idle long enough to have refilled are equivalent to missing ones
+        idle = [k for k, (_, updated) in self._buckets.items() if now - updated >= refill_seconds]
+        if not idle:
+            idle = sorted(self._buckets, key=lambda k: self._buckets[k][1])[: len(self._buckets) // 2]
+        for k in idle:
+            del self._buckets[k]
+
+
+class SQLiteBucketBackend:
+    """Token buckets in a local SQLite file, shared by every worker on the host"""
+
+    # take() runs a SQLite transaction, so it is called from the threadpool
+    blocking = True
+
+    def __init__(self, path: str, busy_timeout: float = 0.05):
+        self.path = path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        # Used while the shared store is contended or failing, so limits still apply per process
+        self.fallback = MemoryBucketBackend()
+        self.fallback_count = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None)
+            conn.execute("PRAGMA synchronous=OFF")
+            self._local.conn = conn
+        return conn
+
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        """Take `cost` tokens, returning 0 if allowed or the seconds until enough tokens refill"""
+        # Wall-clock time, since monotonic clocks aren't comparable across processes
+        now = time.time()
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            return self._fall_back(key, rate, capacity, cost, e)
+        try:
+            row = conn.execute("SELECT tokens, updated FROM buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = min(capacity, tokens + max(0.0, now - updated) * rate)
+            if tokens >= cost:
+                tokens -= cost
+                wait = 0.0
+            else:
+                wait = (cost - tokens) / rate
+            conn.execute("INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)", (key, tokens, now))
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            try:
+                conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            return self._fall_back(key, rate, capacity, cost, e)
+        return wait
+
+    def _fall_back(self, key: str, rate: float, capacity: float, cost: float, error: Exception) -> float:
+        # Contention is when the limiter matters most, so never fail open: limit per process instead
+        self.fallback_count += 1
+        if self.fallback_count == 1 or self.fallback_count % 1000 == 0:
+            logger.warning(
+                "Rate limit store %s unavailable (%s); using per-process buckets (%d times so far)",
+                self.path, error, self.fallback_count
+            )
+        return self.fallback.take(key, rate, capacity, cost)
+
+
+def create_bucket_backend():
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteBucketBackend(settings.RATE_LIMIT_SQLITE_PATH)
+    return MemoryBucketBackend()
+
+
+class RateLimitMiddleware:
+    """Per-user/per-IP token buckets plus a priority-aware global concurrency limit"""
+
+    def __init__(self, app, backend=None, max_concurrent: Optional[int] = None):
+        self.app = app
+        self.backend = backend or create_bucket_backend()
+        self.max_concurrent = max_concurrent or settings.MAX_CONCURRENT_REQUESTS
+        self.in_flight = 0
+        self.api_prefix = settings.API_V1_STR
+        self.expensive_routes = set(settings.RATE_LIMIT_EXPENSIVE_ROUTES)
+        self.high_priority_routes = set(settings.RATE_LIMIT_HIGH_PRIORITY_ROUTES)
+
+    def classify(self, path: str) -> Tuple[str, int]:
+        """Return (bucket class, priority) for a request path"""
+        route = path[len(self.api_prefix):] if path.startswith(self.api_prefix) else path
+        route = route.rstrip("/") or "/"
+        if route in self.expensive_routes:
+            priority = PRIORITY_HIGH if route in self.high_priority_routes else PRIORITY_LOW
+            return "expensive", priority
+        if route in self.high_priority_routes:
+            return "cheap", PRIORITY_HIGH
+        return "cheap", PRIORITY_NORMAL
+
+    def identify(self, scope) -> str:
+        """Authenticated user (JWT subject) if the bearer token is valid, else client IP"""
+        for name, value in scope.get("headers", ()):
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer" and token:
+                    try:
+                        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+                        if payload.get("sub"):
+                            return f"user:{payload['sub']}"
+                    except JWTError:
+                        pass
+                break
+        client = scope.get("client")
+        return f"ip:{client[0] if client else 'unknown'}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path.startswith(f"{self.api_prefix}/health"):
+            await self.app(scope, receive, send)
+            return
+
+        bucket_class, priority = self.classify(path)
+
+        # Shed load before spending anything on the request
+        if self.in_flight >= self.max_concurrent * PRIORITY_SHED_AT[priority]:
+            await self._reject(send, 503, "Server is busy, please retry shortly", 1)
+            return
+
+        rate, burst = settings.RATE_LIMITS[bucket_class]
+        key = f"{bucket_class}:{self.identify(scope)}"
+        if self.backend.blocking:
+            wait = await run_in_threadpool(self.backend.take, key, rate / 60.0, burst)
+        else:
+            wait = self.backend.take(key, rate / 60.0, burst)
+        if wait > 0:
+            await self._reject(send, 429, "Too many requests", math.ceil(wait))
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def _reject(self, send, status_code: int, detail: str, retry_after: int):
+        body = ('{"detail":"%s"}' % detail).encode()
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, retry_after)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,58 @@
+import logging
+import time
+from typing import Any, Dict
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class StartupState:
+    """Tracks how long each startup phase took, for readiness checks and the startup budget"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.errors: Dict[str, str] = {}
+
+    def mark(self, phase: str):
+        self.phases[phase] = round(time.perf_counter() - self.started, 3)
+
+    def fail(self, phase: str, error: Exception):
+        self.errors[phase] = str(error)
+        logger.exception("Startup phase %s failed", phase)
+
+    @property
+    def ready(self) -> bool:
+        return "database" in self.phases and "warm" in self.phases
+
+    def check_budget(self):
+        total = self.phases.get("warm")
+        if total is not None and total > settings.STARTUP_BUDGET_SECONDS:
+            logger.warning(
+                "Startup took %.2fs, over the %.2fs budget (phases: %s)",
+                total, settings.STARTUP_BUDGET_SECONDS, self.phases
+            )
+
+    def report(self) -> Dict[str, Any]:
+        total = self.phases.get("warm")
+        return {
+            "ready": self.ready,
+            "phases": self.phases,
+            "errors": self.errors,
+            "startup_seconds": total,
+            "startup_budget_seconds": settings.STARTUP_BUDGET_SECONDS,
+            "within_budget": None if total is None else total <= settings.STARTUP_BUDGET_SECONDS,
+        }
+
+
+# Created when app.main is first imported, so phases are measured from then
+startup_state = StartupState()
+
+
+def warm_up():
+    """Load heavy modules and fill in-memory caches so the first requests are fast"""
+    # The screener is only imported here, keeping the app import itself light
+    from app.models.screener import load_shared_universe
+
+    load_shared_universe()
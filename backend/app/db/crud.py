@@ -0,0 +1,42 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.db.models import StockData
+
+# Insert or update bars for a ticker, keyed on the (ticker, date) unique index
+def upsert_stock_bars(db: Session, ticker: str, bars: Iterable[Dict[str, Any]]) -> int:
+    now = datetime.utcnow()
+    rows = [
+        {
+            "ticker": ticker.upper(),
+            "date": bar["date"] if isinstance(bar["date"], datetime) else datetime.fromisoformat(bar["date"]),
+            "open": bar["open"],
+            "high": bar["high"],
+            "low": bar["low"],
+            "close": bar["close"],
+            "volume": bar["volume"],
+            "last_updated": now,
+        }
+        for bar in bars
+    ]
+    if not rows:
+        return 0
+
+    insert = pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(StockData).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["ticker", "date"],
+        set_={column: stmt.excluded[column] for column in ["open", "high", "low", "close", "volume", "last_updated"]},
+    )
+    db.execute(stmt)
+    db.commit()
+
+    # Cached history for this ticker, and the screener universe, are now stale
+    cache.bump_version(f"ticker:{ticker.upper()}")
+    cache.bump_version("universe")
+    return len(rows)
@@ -1,14 +1,30 @@
+import contextlib
+import os
+
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 
-from app.db.database import engine
-from app.db.models import Base
 from app.core.auth import get_password_hash
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+from app.db.migrations import MIGRATIONS, applied_versions, run_migrations
 from app.db.models import User
 
-# Create all tables
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process lock, fine for single-worker dev servers
+    fcntl = None
+
+# Create or upgrade all tables
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    run_migrations()
     return True
+
+# Check that every migration has been applied, without applying any (read-only, no DDL)
+def schema_is_current() -> bool:
+    if not inspect(engine).has_table("schema_migrations"):
+        return False
+    return set(applied_versions()) >= {version for version, _, _ in MIGRATIONS}
     
 def create_initial_data(db: Session):
     # Check if we already have users
@@ -25,4 +41,33 @@ def create_initial_data(db: Session):
         db.commit()
         
     # Add more initial data as needed
-    # For example, you could add some initial stock data or model metrics
\ No newline at end of file
+    # For example, you could add some initial stock data or model metrics
+
+# Hold an exclusive lock on a file shared by every worker on this host
+@contextlib.contextmanager
+def startup_lock(path: str):
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+# Migrate and seed once: the first worker to get the lock does the work,
+# the rest wait for it and then find nothing left to do
+def bootstrap_db(lock_path: str = settings.STARTUP_LOCK_FILE):
+    with startup_lock(lock_path):
+        init_db()
+        db = SessionLocal()
+        try:
+            create_initial_data(db)
+        finally:
+            db.close()
+
+if __name__ == "__main__":
+    bootstrap_db()
+    print("Database migrated and seeded")
@@ -0,0 +1,127 @@
+"""Versioned schema migrations.
+
+Each migration runs once per database, in its own transaction, and is recorded in
+the schema_migrations table. Apply pending migrations with:
+
+    python -m app.db.migrations
+"""
+from typing import Callable, List, Tuple
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+from app.db.database import engine
+from app.db.models import Base, SchemaMigration
+
+# Tables that existed before migrations were introduced
+BASE_TABLES = ["users", "watchlist_items", "stock_data", "prediction_results", "model_metrics"]
+
+
+def _create_tables(conn: Connection, names: List[str]):
+    for name in names:
+        Base.metadata.tables[name].create(bind=conn, checkfirst=True)
+
+
+def _create_indexes(conn: Connection, table: str, names: List[str]):
+    for index in Base.metadata.tables[table].indexes:
+        if index.name in names:
+            index.create(bind=conn, checkfirst=True)
+
+
+def _add_columns(conn: Connection, table: str, names: List[str]):
+    # Tables created by earlier migrations already have the model's current columns
+    existing = {column["name"] for column in inspect(conn).get_columns(table)}
+    for name in names:
+        if name not in existing:
+            column = Base.metadata.tables[table].columns[name]
+            column_type = column.type.compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {name} {column_type}"))
+
+
+# 0001: tables as created by the old init_db (no-op on databases that already have them)
+def _initial_schema(conn: Connection):
+    _create_tables(conn, BASE_TABLES)
+
+
+# 0002: drop duplicate rows, then enforce uniqueness and add composite indexes
+def _composite_indexes(conn: Connection):
+    # Keep the most recently written bar / metrics row, and the first watchlist entry
+    conn.execute(text(
+        "DELETE FROM stock_data WHERE id NOT IN "
+        "(SELECT MAX(id) FROM stock_data GROUP BY ticker, date)"
+    ))
+    conn.execute(text(
+        "DELETE FROM model_metrics WHERE id NOT IN "
+        "(SELECT MAX(id) FROM model_metrics GROUP BY ticker, model_name, horizon)"
+    ))
+    conn.execute(text(
+        "DELETE FROM watchlist_items WHERE id NOT IN "
+        "(SELECT MIN(id) FROM watchlist_items GROUP BY user_id, ticker)"
+    ))
+
+    _create_indexes(conn, "stock_data", ["ux_stock_data_ticker_date"])
+    _create_indexes(conn, "model_metrics", ["ux_model_metrics_ticker_model_horizon"])
+    _create_indexes(conn, "watchlist_items", ["ux_watchlist_items_user_ticker"])
+    _create_indexes(conn, "prediction_results", [
+        "ix_prediction_results_ticker_horizon_date",
+        "ix_prediction_results_ticker_horizon_model_date",
+    ])
+
+    # Single-column ticker indexes are now prefixes of the composite ones
+    for name in ["ix_stock_data_ticker", "ix_prediction_results_ticker", "ix_model_metrics_ticker"]:
+        conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+# 0003: summary table for archived predictions
+def _prediction_rollups(conn: Connection):
+    _create_tables(conn, ["prediction_rollups"])
+
+
+# 0004: background job queue
+def _jobs(conn: Connection):
+    _create_tables(conn, ["jobs"])
+
+
+# 0005: job ownership and admin users
+def _job_owners(conn: Connection):
+    _add_columns(conn, "users", ["is_admin"])
+    _add_columns(conn, "jobs", ["user_id"])
+    _create_indexes(conn, "jobs", ["ix_jobs_user_id"])
+
+
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "initial schema", _initial_schema),
+    (2, "composite indexes and uniqueness", _composite_indexes),
+    (3, "prediction rollups", _prediction_rollups),
+    (4, "jobs", _jobs),
+    (5, "job owners", _job_owners),
+]
+
+
+def applied_versions(bind: Engine = engine) -> List[int]:
+    """Versions already recorded in schema_migrations"""
+    with bind.begin() as conn:
+        SchemaMigration.__table__.create(bind=conn, checkfirst=True)
+        return [row[0] for row in conn.execute(text("SELECT version FROM schema_migrations ORDER BY version"))]
+
+
+def run_migrations(bind: Engine = engine) -> List[int]:
+    """Apply pending migrations in order, returning the versions that were applied"""
+    done = set(applied_versions(bind))
+    applied = []
+    for version, name, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with bind.begin() as conn:
+            migrate(conn)
+            conn.execute(SchemaMigration.__table__.insert().values(version=version, name=name))
+        applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    applied = run_migrations()
+    if applied:
+        print(f"Applied migrations: {applied}")
+    else:
+        print("Database is up to date")
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Float, Text
+from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, DateTime, Float, Text, Index, JSON
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -12,6 +12,7 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
+    is_admin = Column(Boolean, default=False)  # may see and cancel every user's jobs
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
@@ -29,11 +30,15 @@ class WatchlistItem(Base):
     # Relationships
     user = relationship("User", back_populates="watchlist")
 
+    __table_args__ = (
+        Index("ux_watchlist_items_user_ticker", "user_id", "ticker", unique=True),
+    )
+
 class StockData(Base):
     __tablename__ = "stock_data"
 
     id = Column(Integer, primary_key=True, index=True)
-    ticker = Column(String, index=True)
+    ticker = Column(String)
     date = Column(DateTime, index=True)
     open = Column(Float)
     high = Column(Float)
@@ -42,6 +47,11 @@ class StockData(Base):
     volume = Column(Integer)
     last_updated = Column(DateTime, default=datetime.utcnow)
 
+    # One bar per (ticker, date); also serves "latest bar per ticker" and range scans
+    __table_args__ = (
+        Index("ux_stock_data_ticker_date", "ticker", "date", unique=True),
+    )
+
     class Config:
         orm_mode = True
 
@@ -49,7 +59,7 @@ class PredictionResult(Base):
     __tablename__ = "prediction_results"
 
     id = Column(Integer, primary_key=True, index=True)
-    ticker = Column(String, index=True)
+    ticker = Column(String)
     prediction_date = Column(DateTime, default=datetime.utcnow)
     target_date = Column(DateTime)
     horizon = Column(String)  # e.g., "1d", "5d"
@@ -59,6 +69,13 @@ class PredictionResult(Base):
     actual_result = Column(String, nullable=True)  # "up" or "down", filled after the fact
     was_correct = Column(Boolean, nullable=True)  # filled after the fact
 
+    __table_args__ = (
+        # Prediction log per (ticker, horizon), newest first
+        Index("ix_prediction_results_ticker_horizon_date", "ticker", "horizon", "prediction_date"),
+        # Latest prediction per (ticker, horizon, model)
+        Index("ix_prediction_results_ticker_horizon_model_date", "ticker", "horizon", "model_name", "prediction_date"),
+    )
+
     class Config:
         orm_mode = True
 
@@ -66,7 +83,7 @@ class ModelMetrics(Base):
     __tablename__ = "model_metrics"
 
     id = Column(Integer, primary_key=True, index=True)
-    ticker = Column(String, index=True)
+    ticker = Column(String)
     model_name = Column(String, index=True)
     horizon = Column(String, index=True)  # e.g., "1d", "5d"
     accuracy = Column(Float)
@@ -76,5 +93,65 @@ class ModelMetrics(Base):
     validation_period = Column(String)  # e.g., "2022-01-01 to 2022-12-31"
     last_updated = Column(DateTime, default=datetime.utcnow)
 
+    # One metrics row per (ticker, model, horizon)
+    __table_args__ = (
+        Index("ux_model_metrics_ticker_model_horizon", "ticker", "model_name", "horizon", unique=True),
+    )
+
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class PredictionRollup(Base):
+    """Monthly summary of resolved predictions that have been archived out of prediction_results"""
+    __tablename__ = "prediction_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ticker = Column(String)
+    horizon = Column(String)
+    model_name = Column(String)
+    period_start = Column(DateTime)  # first day of the month the predictions were made in
+    predictions = Column(Integer, default=0)
+    correct = Column(Integer, default=0)
+    avg_confidence = Column(Float)
+    last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ux_prediction_rollups_key", "ticker", "horizon", "model_name", "period_start", unique=True),
+    )
+
+class Job(Base):
+    """Background job (backfill, metric recomputation, outcome resolution, ...) run by app.jobs.worker"""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_type = Column(String)
+    status = Column(String, default="queued")  # queued, running, succeeded, failed, cancelled
+    priority = Column(Integer, default=0)  # higher runs first
+    payload = Column(JSON, default=dict)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    progress = Column(Float, default=0.0)  # 0.0 - 1.0
+    progress_message = Column(String, nullable=True)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    idempotency_key = Column(String, nullable=True, unique=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)  # submitter; None for internal jobs
+    cancel_requested = Column(Boolean, default=False)
+    worker_id = Column(String, nullable=True)
+    run_after = Column(DateTime, default=datetime.utcnow)  # pushed back between retries
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Claiming: next runnable job by priority
+        Index("ix_jobs_status_priority_run_after", "status", "priority", "run_after"),
+    )
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    name = Column(String)
+    applied_at = Column(DateTime, default=datetime.utcnow)
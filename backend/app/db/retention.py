@@ -0,0 +1,102 @@
+"""Archive old resolved predictions into monthly rollups.
+
+Run periodically (e.g. from cron) with:
+
+    python -m app.db.retention [--days N]
+"""
+import argparse
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.db.models import PredictionResult, PredictionRollup
+
+RollupKey = Tuple[str, str, str, datetime]
+
+
+def _month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def _merge_rollups(db: Session, totals: Dict[RollupKey, list]):
+    """Add batch totals ([count, correct, confidence sum]) to the stored rollups"""
+    for (ticker, horizon, model_name, period_start), (count, correct, confidence_sum) in totals.items():
+        rollup = db.query(PredictionRollup).filter(
+            PredictionRollup.ticker == ticker,
+            PredictionRollup.horizon == horizon,
+            PredictionRollup.model_name == model_name,
+            PredictionRollup.period_start == period_start
+        ).first()
+        if rollup is None:
+            rollup = PredictionRollup(
+                ticker=ticker,
+                horizon=horizon,
+                model_name=model_name,
+                period_start=period_start,
+                predictions=0,
+                correct=0,
+                avg_confidence=0.0
+            )
+            db.add(rollup)
+
+        # Keep avg_confidence a true mean across every archived prediction
+        total = rollup.predictions + count
+        rollup.avg_confidence = ((rollup.avg_confidence or 0.0) * rollup.predictions + confidence_sum) / total
+        rollup.predictions = total
+        rollup.correct += correct
+
+
+def archive_resolved_predictions(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: int = 5000
+) -> int:
+    """Move resolved predictions older than the cutoff into rollups, returning how many were archived"""
+    days = settings.PREDICTION_RETENTION_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    archived = 0
+    last_id = 0
+
+    while True:
+        batch = db.query(PredictionResult).filter(
+            PredictionResult.id > last_id,
+            PredictionResult.prediction_date < cutoff,
+            PredictionResult.was_correct.isnot(None)
+        ).order_by(PredictionResult.id).limit(batch_size).all()
+        if not batch:
+            break
+
+        totals: Dict[RollupKey, list] = {}
+        for prediction in batch:
+            key = (prediction.ticker, prediction.horizon, prediction.model_name, _month_start(prediction.prediction_date))
+            entry = totals.setdefault(key, [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += 1 if prediction.was_correct else 0
+            entry[2] += prediction.confidence or 0.0
+
+        # Rollups and deletes commit together so a crash never double-counts a batch
+        ids = [prediction.id for prediction in batch]
+        _merge_rollups(db, totals)
+        db.query(PredictionResult).filter(PredictionResult.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+
+        archived += len(ids)
+        last_id = ids[-1]
+
+    return archived
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive old resolved predictions into monthly rollups")
+    parser.add_argument("--days", type=int, default=None, help="retention window in days")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        count = archive_resolved_predictions(db, older_than_days=args.days)
+    finally:
+        db.close()
+    print(f"Archived {count} predictions")
@@ -0,0 +1 @@
+# Jobs package initialization
\ No newline at end of file
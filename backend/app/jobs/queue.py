@@ -0,0 +1,203 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+
+from app.core.config import settings
+from app.db.models import Job
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested"""
+
+
+class JobLost(Exception):
+    """Raised inside a running job once it has been requeued or claimed by another worker"""
+
+
+# Queue a job, or return the existing one if the idempotency key was already used
+def enqueue_job(
+    db: Session,
+    job_type: str,
+    payload: Optional[Dict[str, Any]] = None,
+    priority: int = 0,
+    idempotency_key: Optional[str] = None,
+    max_attempts: int = 3,
+    user_id: Optional[int] = None
+) -> Job:
+    if idempotency_key:
+        existing = db.query(Job).filter(Job.idempotency_key == idempotency_key).first()
+        if existing:
+            return existing
+
+    job = Job(
+        job_type=job_type,
+        payload=payload or {},
+        priority=priority,
+        idempotency_key=idempotency_key,
+        max_attempts=max_attempts,
+        user_id=user_id,
+        status="queued",
+        run_after=datetime.utcnow()
+    )
+    db.add(job)
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request with the same key won the race
+        db.rollback()
+        return db.query(Job).filter(Job.idempotency_key == idempotency_key).one()
+    db.refresh(job)
+    return job
+
+# Cancel a queued job immediately; ask a running one to stop at its next progress report
+def request_cancel(db: Session, job: Job) -> Job:
+    # Conditional updates, so a worker claiming the job in between is never overwritten
+    cancelled = db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == "queued")
+        .values(status="cancelled", finished_at=datetime.utcnow())
+    ).rowcount
+    if not cancelled:
+        db.execute(update(Job).where(Job.id == job.id, Job.status == "running").values(cancel_requested=True))
+    db.commit()
+    db.refresh(job)
+    return job
+
+# Atomically move the next runnable job to "running", respecting per-type concurrency caps
+def claim_next_job(db: Session, worker_id: str, concurrency: Dict[str, int]) -> Optional[Job]:
+    now = datetime.utcnow()
+    running = dict(
+        db.query(Job.job_type, func.count(Job.id))
+        .filter(Job.status == "running")
+        .group_by(Job.job_type)
+        .all()
+    )
+    full = [job_type for job_type, cap in concurrency.items() if running.get(job_type, 0) >= cap]
+
+    query = db.query(Job.id, Job.job_type).filter(Job.status == "queued", Job.run_after <= now)
+    if full:
+        query = query.filter(Job.job_type.notin_(full))
+    candidates = query.order_by(Job.priority.desc(), Job.id).limit(10).all()
+
+    for job_id, job_type in candidates:
+        conditions = [Job.id == job_id, Job.status == "queued"]
+        cap = concurrency.get(job_type)
+        if cap is not None:
+            # The count above is only a pre-filter; the cap is enforced by the claim itself
+            running_jobs = aliased(Job)
+            conditions.append(
+                select(func.count(running_jobs.id))
+                .where(running_jobs.job_type == job_type, running_jobs.status == "running")
+                .scalar_subquery() < cap
+            )
+            if db.get_bind().dialect.name == "postgresql":
+                # Concurrent claims of different rows would each count the other as not yet
+                # running, so serialize claims per job type for the rest of this transaction
+                db.execute(select(func.pg_advisory_xact_lock(func.hashtext(f"jobs:{job_type}"))))
+
+        # Only one worker can flip a given row from queued to running
+        claimed = db.execute(
+            update(Job)
+            .where(*conditions)
+            .values(
+                status="running",
+                worker_id=worker_id,
+                attempts=Job.attempts + 1,
+                started_at=now,
+                heartbeat_at=now
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(Job, job_id)
+    return None
+
+def _owned(job_id: int, worker_id: str, attempt: int):
+    # A job belongs to the worker that claimed it, and only for that attempt; once it has
+    # been requeued or re-claimed, writes from the original run must not land
+    return (Job.id == job_id, Job.status == "running", Job.worker_id == worker_id, Job.attempts == attempt)
+
+# Refresh the heartbeat; returns False if the job is no longer ours
+def heartbeat(db: Session, job_id: int, worker_id: str, attempt: int) -> bool:
+    updated = db.execute(
+        update(Job).where(*_owned(job_id, worker_id, attempt)).values(heartbeat_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    return bool(updated)
+
+# Record progress and refresh the heartbeat; raises JobCancelled if the job should stop
+# and JobLost if another worker has taken it over
+def report_progress(
+    db: Session, job_id: int, worker_id: str, attempt: int, progress: float, message: Optional[str] = None
+):
+    updated = db.execute(
+        update(Job)
+        .where(*_owned(job_id, worker_id, attempt))
+        .values(progress=max(0.0, min(1.0, progress)), progress_message=message, heartbeat_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    if not updated:
+        raise JobLost()
+    if db.query(Job.cancel_requested).filter(Job.id == job_id).scalar():
+        raise JobCancelled()
+
+def complete_job(db: Session, job_id: int, worker_id: str, attempt: int, result: Optional[Dict[str, Any]] = None) -> bool:
+    now = datetime.utcnow()
+    updated = db.execute(
+        update(Job)
+        .where(*_owned(job_id, worker_id, attempt))
+        .values(status="succeeded", result=result, progress=1.0, finished_at=now)
+    ).rowcount
+    db.commit()
+    return bool(updated)
+
+def cancel_running_job(db: Session, job_id: int, worker_id: str, attempt: int) -> bool:
+    updated = db.execute(
+        update(Job).where(*_owned(job_id, worker_id, attempt)).values(status="cancelled", finished_at=datetime.utcnow())
+    ).rowcount
+    db.commit()
+    return bool(updated)
+
+# Requeue with exponential backoff, or mark failed once attempts run out
+def fail_job(db: Session, job_id: int, worker_id: str, attempt: int, error: str) -> bool:
+    now = datetime.utcnow()
+    owned = _owned(job_id, worker_id, attempt)
+    retry = db.execute(
+        update(Job)
+        .where(*owned, Job.attempts < Job.max_attempts)
+        .values(
+            status="queued",
+            error=error,
+            worker_id=None,
+            run_after=now + timedelta(seconds=settings.JOB_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)))
+        )
+    ).rowcount
+    failed = 0
+    if not retry:
+        failed = db.execute(
+            update(Job).where(*owned).values(status="failed", error=error, finished_at=now)
+        ).rowcount
+    db.commit()
+    return bool(retry or failed)
+
+# Put back running jobs whose worker stopped sending heartbeats (e.g. it crashed)
+def requeue_stale_jobs(db: Session) -> int:
+    now = datetime.utcnow()
+    stale = (Job.status == "running", Job.heartbeat_at < now - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS))
+    db.execute(
+        update(Job).where(*stale, Job.cancel_requested.is_(True)).values(status="cancelled", finished_at=now)
+    )
+    db.execute(
+        update(Job)
+        .where(*stale, Job.attempts >= Job.max_attempts)
+        .values(status="failed", error="Worker stopped responding", finished_at=now)
+    )
+    count = db.execute(
+        update(Job).where(*stale).values(status="queued", worker_id=None, run_after=now)
+    ).rowcount
+    db.commit()
+    return count
@@ -0,0 +1,112 @@
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.db.crud import upsert_stock_bars
+from app.db.models import ModelMetrics, PredictionResult, StockData
+from app.models.mock_data import MOCK_STOCKS, generate_mock_historical_data, generate_mock_metrics
+
+# A task gets the DB session, the job payload and a progress callback, and returns a JSON-able result.
+# `concurrency` caps how many jobs of the type run at once across all workers.
+JobType = namedtuple("JobType", ["func", "concurrency"])
+
+JOB_TYPES: Dict[str, JobType] = {}
+
+
+def job_type(name: str, concurrency: int = 1):
+    def register(func: Callable[[Session, Dict[str, Any], Callable], Dict[str, Any]]):
+        JOB_TYPES[name] = JobType(func, concurrency)
+        return func
+    return register
+
+
+def _tickers(payload: Dict[str, Any]):
+    tickers = payload.get("tickers") or [stock["ticker"] for stock in MOCK_STOCKS]
+    return [ticker.upper() for ticker in tickers]
+
+
+@job_type("backfill_history", concurrency=2)
+def backfill_history(db: Session, payload: Dict[str, Any], progress: Callable) -> Dict[str, Any]:
+    """Load historical bars for the given tickers into stock_data"""
+    tickers = _tickers(payload)
+    period = payload.get("range", "all")
+    bars = 0
+    for i, ticker in enumerate(tickers):
+        # In a real implementation, this would call the market data API
+        bars += upsert_stock_bars(db, ticker, generate_mock_historical_data(ticker, period))
+        progress((i + 1) / len(tickers), f"Backfilled {ticker}")
+    return {"tickers": len(tickers), "bars": bars}
+
+
+@job_type("recompute_metrics", concurrency=1)
+def recompute_metrics(db: Session, payload: Dict[str, Any], progress: Callable) -> Dict[str, Any]:
+    """Recompute per-model validation metrics for the given tickers"""
+    tickers = _tickers(payload)
+    horizon = payload.get("horizon", settings.PREDICTION_HORIZON[0])
+    rows = 0
+    for i, ticker in enumerate(tickers):
+        # In a real implementation, this would re-run model validation
+        for model_name, scores in generate_mock_metrics(ticker)["metrics"].items():
+            metrics = db.query(ModelMetrics).filter(
+                ModelMetrics.ticker == ticker,
+                ModelMetrics.model_name == model_name,
+                ModelMetrics.horizon == horizon
+            ).first()
+            if metrics is None:
+                metrics = ModelMetrics(ticker=ticker, model_name=model_name, horizon=horizon)
+                db.add(metrics)
+            precision, recall = scores["precision"], scores["recall"]
+            metrics.accuracy = scores["accuracy"]
+            metrics.precision_up = precision
+            metrics.recall_up = recall
+            metrics.f1_score = round(2 * precision * recall / (precision + recall), 2) if precision + recall else 0.0
+            metrics.last_updated = datetime.utcnow()
+            rows += 1
+        db.commit()
+        progress((i + 1) / len(tickers), f"Recomputed metrics for {ticker}")
+    return {"tickers": len(tickers), "rows": rows}
+
+
+@job_type("resolve_outcomes", concurrency=1)
+def resolve_outcomes(db: Session, payload: Dict[str, Any], progress: Callable) -> Dict[str, Any]:
+    """Fill in actual_result/was_correct for predictions whose target date has passed"""
+    pending = db.query(PredictionResult).filter(
+        PredictionResult.actual_result.is_(None),
+        PredictionResult.target_date <= datetime.utcnow()
+    ).order_by(PredictionResult.id).limit(payload.get("limit", 10000)).all()
+
+    resolved = 0
+    for i, prediction in enumerate(pending):
+        # Compare the last close at or before each date
+        closes = []
+        for when in (prediction.prediction_date, prediction.target_date):
+            bar = db.query(StockData.close).filter(
+                StockData.ticker == prediction.ticker,
+                StockData.date <= when
+            ).order_by(StockData.date.desc()).first()
+            closes.append(bar.close if bar else None)
+        if None not in closes:
+            prediction.actual_result = "up" if closes[1] > closes[0] else "down"
+            prediction.was_correct = prediction.actual_result == prediction.prediction
+            resolved += 1
+        if (i + 1) % 500 == 0:
+            db.commit()
+            progress((i + 1) / len(pending), f"Resolved {resolved} of {i + 1}")
+    db.commit()
+
+    if resolved:
+        cache.bump_version("predictions")
+    return {"checked": len(pending), "resolved": resolved}
+
+
+@job_type("refresh_universe", concurrency=1)
+def refresh_universe(db: Session, payload: Dict[str, Any], progress: Callable) -> Dict[str, Any]:
+    """Rebuild the screener universe and publish it to all API workers"""
+    from app.models.screener import refresh_universe as rebuild
+
+    snapshot = rebuild()
+    return {"tickers": len(snapshot.tickers)}
@@ -0,0 +1,168 @@
+"""Background job worker pool.
+
+Run alongside the API (after `python -m app.db.init_db`) with:
+
+    python -m app.jobs.worker [--processes N]
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+from typing import Optional
+
+from app.core.config import settings
+from app.db.database import SessionLocal
+from app.jobs.queue import (
+    JobCancelled, JobLost, cancel_running_job, claim_next_job, complete_job, fail_job, heartbeat, report_progress,
+    requeue_stale_jobs
+)
+from app.jobs.tasks import JOB_TYPES
+
+logger = logging.getLogger(__name__)
+
+
+class Heartbeat(threading.Thread):
+    """Keep a claimed job's heartbeat fresh while it runs, however rarely the task reports progress"""
+
+    def __init__(self, job_id: int, worker_id: str, attempt: int):
+        super().__init__(name=f"heartbeat-{job_id}", daemon=True)
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.attempt = attempt
+        self.lost = False
+        self._stop_event = threading.Event()
+
+    def run(self):
+        db = SessionLocal()
+        try:
+            while not self._stop_event.wait(settings.JOB_HEARTBEAT_SECONDS):
+                try:
+                    if not heartbeat(db, self.job_id, self.worker_id, self.attempt):
+                        self.lost = True
+                        return
+                except Exception:
+                    db.rollback()
+                    logger.exception("Heartbeat for job %s failed", self.job_id)
+        finally:
+            db.close()
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_one(worker_id: str) -> bool:
+    """Claim and run a single job, returning False if nothing was runnable"""
+    db = SessionLocal()
+    try:
+        concurrency = {name: job_type.concurrency for name, job_type in JOB_TYPES.items()}
+        job = claim_next_job(db, worker_id, concurrency)
+        if job is None:
+            return False
+
+        job_id, attempt = job.id, job.attempts
+        logger.info("Worker %s running job %s (%s, attempt %s)", worker_id, job_id, job.job_type, attempt)
+        job_type = JOB_TYPES.get(job.job_type)
+        beat = Heartbeat(job_id, worker_id, attempt)
+        beat.start()
+        try:
+            if job_type is None:
+                raise ValueError(f"Unknown job type {job.job_type!r}")
+
+            # Progress gets its own session so a task's uncommitted work isn't flushed by it
+            progress_db = SessionLocal()
+            try:
+                def progress(fraction: float, message: Optional[str] = None):
+                    if beat.lost:
+                        raise JobLost()
+                    report_progress(progress_db, job_id, worker_id, attempt, fraction, message)
+
+                result = job_type.func(db, dict(job.payload or {}), progress)
+            finally:
+                progress_db.close()
+        except JobLost:
+            db.rollback()
+            logger.warning("Job %s was taken over by another worker; dropping this run", job_id)
+            return True
+        except JobCancelled:
+            db.rollback()
+            cancel_running_job(db, job_id, worker_id, attempt)
+            logger.info("Job %s cancelled", job_id)
+        except Exception:
+            db.rollback()
+            fail_job(db, job_id, worker_id, attempt, traceback.format_exc(limit=5))
+            logger.exception("Job %s failed", job_id)
+        else:
+            if not complete_job(db, job_id, worker_id, attempt, result):
+                logger.warning("Job %s was taken over by another worker; result discarded", job_id)
+        finally:
+            beat.stop()
+        return True
+    finally:
+        db.close()
+
+
+def worker_loop(worker_id: str):
+    # The supervisor handles Ctrl-C; workers exit when it terminates them
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            ran = run_one(worker_id)
+        except Exception:
+            logger.exception("Worker %s could not claim a job", worker_id)
+            ran = False
+        if not ran:
+            time.sleep(settings.JOB_POLL_INTERVAL_SECONDS)
+
+
+def main(processes: int):
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    host = socket.gethostname()
+
+    # Spawned (not forked) so each worker opens its own database connections
+    context = multiprocessing.get_context("spawn")
+    pool = {}
+
+    def start(slot: int):
+        worker_id = f"{host}:{os.getpid()}:{slot}"
+        process = context.Process(target=worker_loop, args=(worker_id,), name=f"job-worker-{slot}", daemon=True)
+        process.start()
+        pool[slot] = process
+
+    for slot in range(processes):
+        start(slot)
+
+    try:
+        while True:
+            time.sleep(settings.JOB_POLL_INTERVAL_SECONDS * 5)
+            db = SessionLocal()
+            try:
+                requeued = requeue_stale_jobs(db)
+                if requeued:
+                    logger.warning("Requeued %s stale jobs", requeued)
+            finally:
+                db.close()
+            # Replace any worker process that died
+            for slot, process in list(pool.items()):
+                if not process.is_alive():
+                    logger.warning("Worker %s exited with %s, restarting", process.name, process.exitcode)
+                    start(slot)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for process in pool.values():
+            process.terminate()
+        for process in pool.values():
+            process.join(timeout=5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background job workers")
+    parser.add_argument("--processes", type=int, default=settings.JOB_WORKER_PROCESSES)
+    args = parser.parse_args()
+    main(args.processes)
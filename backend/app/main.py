@@ -1,14 +1,19 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+# Imported first so the startup clock covers loading the rest of the app
+from app.core.startup import startup_state
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from typing import List, Optional
-from datetime import datetime, timedelta
 import uvicorn
 
 from app.api.routes import api_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.db.database import engine, get_db
-from app.db.init_db import init_db, create_initial_data
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.startup import warm_up
+from app.db.init_db import bootstrap_db, schema_is_current
 
 app = FastAPI(
     title="Stock Prediction API",
@@ -16,6 +21,14 @@ app = FastAPI(
     version="0.1.0"
 )
 
+# Compress large JSON responses (innermost, so rejections below skip it)
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Rate limiting and load shedding (added before CORS so rejections still get CORS headers)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -25,11 +38,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize database
-init_db()
-
 # Include API router
 app.include_router(api_router, prefix=f"{settings.API_V1_STR}")
+startup_state.mark("imported")
 
 @app.get("/")
 async def root():
@@ -39,14 +50,29 @@ async def root():
         "version": "0.1.0"
     }
 
+async def _warm_up():
+    try:
+        await run_in_threadpool(warm_up)
+        startup_state.mark("warm")
+        startup_state.check_budget()
+    except Exception as e:
+        startup_state.fail("warm", e)
+
 @app.on_event("startup")
 async def startup_event():
-    # Create initial data
-    db = next(get_db())
+    # Schema and seed data: once per host under a file lock, or by a separate deploy step
     try:
-        create_initial_data(db)
-    finally:
-        db.close()
+        if settings.STARTUP_MODE == "external":
+            if not await run_in_threadpool(schema_is_current):
+                raise RuntimeError("Database schema is out of date; run `python -m app.db.init_db`")
+        else:
+            await run_in_threadpool(bootstrap_db)
+        startup_state.mark("database")
+    except Exception as e:
+        startup_state.fail("database", e)
+
+    # Warm caches in the background; /api/health/ready reports when this is done
+    app.state.warm_up_task = asyncio.create_task(_warm_up())
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,140 @@
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# One row per bar, 48 bytes each, instead of a dict of boxed Python objects per bar
+BAR_DTYPE = np.dtype([
+    ("date", "datetime64[D]"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "i8"),
+])
+
+PRICE_FIELDS = ("open", "high", "low", "close")
+
+# JSON shape of one bar, matching StockDataPoint
+_BAR_JSON = '{"date":"%s","open":%r,"high":%r,"low":%r,"close":%r,"volume":%d}'
+
+
+class BarSeries:
+    """Date-sorted OHLCV bars for one ticker, stored as a NumPy structured array"""
+
+    __slots__ = ("ticker", "bars")
+
+    def __init__(self, ticker: str, bars: np.ndarray):
+        self.ticker = ticker
+        self.bars = bars
+
+    @classmethod
+    def from_columns(
+        cls,
+        ticker: str,
+        dates: Sequence,
+        open: Sequence[float],
+        high: Sequence[float],
+        low: Sequence[float],
+        close: Sequence[float],
+        volume: Sequence[int]
+    ) -> "BarSeries":
+        bars = np.empty(len(dates), dtype=BAR_DTYPE)
+        bars["date"] = np.asarray(dates, dtype="datetime64[D]")
+        bars["open"] = open
+        bars["high"] = high
+        bars["low"] = low
+        bars["close"] = close
+        bars["volume"] = volume
+        return cls(ticker, bars)
+
+    @classmethod
+    def from_records(cls, ticker: str, records: Sequence[Dict[str, Any]]) -> "BarSeries":
+        return cls.from_columns(
+            ticker,
+            [r["date"] for r in records],
+            *([r[name] for r in records] for name in ("open", "high", "low", "close", "volume"))
+        )
+
+    @classmethod
+    def from_bytes(cls, ticker: str, data: bytes) -> "BarSeries":
+        """Inverse of to_bytes; the array is a read-only view over `data`, not a copy"""
+        return cls(ticker, np.frombuffer(data, dtype=BAR_DTYPE))
+
+    def to_bytes(self) -> bytes:
+        """Raw array bytes, used as the compact cache representation"""
+        return np.ascontiguousarray(self.bars).tobytes()
+
+    def __len__(self) -> int:
+        return len(self.bars)
+
+    def slice(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        after_date: Optional[date] = None
+    ) -> "BarSeries":
+        """Bars in [start, end], keeping only those strictly after after_date (binary search, no copy)"""
+        dates = self.bars["date"]
+        lo, hi = 0, len(dates)
+        if start:
+            lo = int(np.searchsorted(dates, np.datetime64(start, "D"), side="left"))
+        if after_date:
+            lo = max(lo, int(np.searchsorted(dates, np.datetime64(after_date, "D"), side="right")))
+        if end:
+            hi = int(np.searchsorted(dates, np.datetime64(end, "D"), side="right"))
+        return BarSeries(self.ticker, self.bars[lo:max(lo, hi)])
+
+    def validate(self):
+        """Check the whole series at once; raises ValueError describing the first problem found"""
+        bars = self.bars
+        if len(bars) == 0:
+            return
+        if np.isnat(bars["date"]).any():
+            raise ValueError("bar dates must be set")
+        if len(bars) > 1 and not (np.diff(bars["date"]) > np.timedelta64(0, "D")).all():
+            raise ValueError("bar dates must be strictly increasing")
+        prices = np.stack([bars[name] for name in PRICE_FIELDS])
+        if not np.isfinite(prices).all():
+            raise ValueError("bar prices must be finite")
+        if (prices < 0).any() or (bars["volume"] < 0).any():
+            raise ValueError("bar prices and volumes must be non-negative")
+        body_low = np.minimum(bars["open"], bars["close"])
+        body_high = np.maximum(bars["open"], bars["close"])
+        if (bars["low"] > body_low).any() or (bars["high"] < body_high).any():
+            raise ValueError("bar low/high must bound open and close")
+
+    def to_json(self, chunk_size: int = 2048) -> bytes:
+        """Serialize as a JSON list of bar objects straight from the column arrays"""
+        bars = self.bars
+        if len(bars) == 0:
+            return b"[]"
+        # Format a chunk of rows at a time from column slices; no per-bar dicts, and the
+        # transient Python floats/strings never exceed one chunk
+        chunks = []
+        for lo in range(0, len(bars), chunk_size):
+            chunk = bars[lo:lo + chunk_size]
+            rows = zip(
+                np.datetime_as_string(chunk["date"], unit="D").tolist(),
+                chunk["open"].tolist(),
+                chunk["high"].tolist(),
+                chunk["low"].tolist(),
+                chunk["close"].tolist(),
+                chunk["volume"].tolist(),
+            )
+            chunks.append(",".join(map(_BAR_JSON.__mod__, rows)).encode())
+        return b"[" + b",".join(chunks) + b"]"
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Per-bar dicts, for callers that still want the old list-of-dicts shape"""
+        return [
+            {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+            for d, o, h, l, c, v in zip(
+                np.datetime_as_string(self.bars["date"], unit="D").tolist(),
+                self.bars["open"].tolist(),
+                self.bars["high"].tolist(),
+                self.bars["low"].tolist(),
+                self.bars["close"].tolist(),
+                self.bars["volume"].tolist(),
+            )
+        ]
@@ -1,33 +1,49 @@
 import datetime
 import random
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any
 
 from app.core.config import settings
 
+if TYPE_CHECKING:
+    from app.models.bars import BarSeries
+
+# Mock ticker universe
+MOCK_STOCKS = [
+    {"ticker": "AAPL", "name": "Apple Inc."},
+    {"ticker": "MSFT", "name": "Microsoft Corporation"},
+    {"ticker": "GOOGL", "name": "Alphabet Inc."},
+    {"ticker": "AMZN", "name": "Amazon.com Inc."},
+    {"ticker": "TSLA", "name": "Tesla, Inc."},
+    {"ticker": "META", "name": "Meta Platforms, Inc."},
+    {"ticker": "NVDA", "name": "NVIDIA Corporation"},
+    {"ticker": "NFLX", "name": "Netflix, Inc."},
+    {"ticker": "PYPL", "name": "PayPal Holdings, Inc."},
+    {"ticker": "INTC", "name": "Intel Corporation"}
+]
+
+# Calendar days of history behind each range bucket; "all" is everything that is stored
+HISTORY_RANGE_DAYS = {"1w": 7, "1m": 30, "3m": 90, "6m": 180, "1y": 365, "all": 1000}
+
 # Mock stock data
-def generate_mock_historical_data(ticker: str, range: str = "1y") -> List[Dict[str, Any]]:
-    """Generate mock historical stock data"""
+
+def generate_mock_bar_series(ticker: str, period: str = "1y") -> "BarSeries":
+    """Generate mock historical stock data as a compact bar series"""
+    # Imported here so importing the app doesn't load NumPy
+    from app.models.bars import BarSeries
+
     # Determine date range
     end_date = datetime.datetime.now()
-    if range == "1w":
-        days = 7
-    elif range == "1m":
-        days = 30
-    elif range == "3m":
-        days = 90
-    elif range == "6m":
-        days = 180
-    elif range == "1y":
-        days = 365
-    else:  # "all"
-        days = 1000
+    days = HISTORY_RANGE_DAYS.get(period, HISTORY_RANGE_DAYS["all"])
     
-    # Generate data
-    data = []
-    base_price = random.uniform(50, 500)  # Random starting price based on ticker
+    # A private generator seeded by ticker gives consistent results for the same ticker, even when
+    # several cache fills run at once in the threadpool (the global random module is shared state)
+    rng = random.Random(sum(ord(c) for c in ticker))
     
-    # Seed random with ticker to get consistent results for the same ticker
-    random.seed(sum(ord(c) for c in ticker))
+    # Generate data column by column
+    dates, opens, highs, lows, closes, volumes = [], [], [], [], [], []
+    # Drawn from the seeded generator, so the whole series (starting price included) is the same
+    # on every call; cached fills shared between workers rely on this
+    base_price = rng.uniform(50, 500)  # Random starting price based on ticker
     
     for i in range(days):
         date = end_date - datetime.timedelta(days=days-i)
@@ -36,48 +52,51 @@ def generate_mock_historical_data(ticker: str, range: str = "1y") -> List[Dict[s
             continue
             
         # Generate price with some randomness but trending
-        change_percent = random.uniform(-0.03, 0.03)  # Daily change between -3% and 3%
+        change_percent = rng.uniform(-0.03, 0.03)  # Daily change between -3% and 3%
         base_price = base_price * (1 + change_percent)
         
         # Generate OHLCV data
         open_price = base_price
-        high_price = open_price * (1 + random.uniform(0, 0.02))  # Up to 2% higher
-        low_price = open_price * (1 - random.uniform(0, 0.02))   # Up to 2% lower
-        close_price = random.uniform(low_price, high_price)       # Between low and high
-        volume = int(random.uniform(100000, 10000000))           # Random volume
+        high_price = open_price * (1 + rng.uniform(0, 0.02))  # Up to 2% higher
+        low_price = open_price * (1 - rng.uniform(0, 0.02))   # Up to 2% lower
+        close_price = rng.uniform(low_price, high_price)       # Between low and high
+        volume = int(rng.uniform(100000, 10000000))           # Random volume
         
-        data.append({
-            "date": date.strftime("%Y-%m-%d"),
-            "open": round(open_price, 2),
-            "high": round(high_price, 2),
-            "low": round(low_price, 2),
-            "close": round(close_price, 2),
-            "volume": volume
-        })
+        dates.append(date.date())
+        opens.append(round(open_price, 2))
+        highs.append(round(high_price, 2))
+        lows.append(round(low_price, 2))
+        closes.append(round(close_price, 2))
+        volumes.append(volume)
     
-    return data
+    return BarSeries.from_columns(ticker.upper(), dates, opens, highs, lows, closes, volumes)
+
+# Mock stock data
+def generate_mock_historical_data(ticker: str, period: str = "1y") -> List[Dict[str, Any]]:
+    """Generate mock historical stock data"""
+    return generate_mock_bar_series(ticker, period).to_records()
 
 # Mock prediction data
 def generate_mock_prediction(ticker: str, horizon: str, models: List[str]) -> Dict[str, Any]:
     """Generate mock stock prediction"""
     # Seed random with ticker and horizon to get consistent results
-    random.seed(sum(ord(c) for c in ticker) + sum(ord(c) for c in horizon))
+    rng = random.Random(sum(ord(c) for c in ticker) + sum(ord(c) for c in horizon))
     
     # Generate model scores (around 70% accuracy as per requirements)
     model_scores = {}
     for model in models:
         if model == "xgboost":
-            score = random.uniform(0.68, 0.74)  # XGBoost performs well
+            score = rng.uniform(0.68, 0.74)  # XGBoost performs well
         elif model == "lstm":
-            score = random.uniform(0.67, 0.73)  # LSTM also performs well
+            score = rng.uniform(0.67, 0.73)  # LSTM also performs well
         elif model == "gru":
-            score = random.uniform(0.66, 0.72)  # GRU slightly worse than LSTM
+            score = rng.uniform(0.66, 0.72)  # GRU slightly worse than LSTM
         elif model == "arima":
-            score = random.uniform(0.60, 0.65)  # ARIMA is a baseline model
+            score = rng.uniform(0.60, 0.65)  # ARIMA is a baseline model
         elif model == "ma_crossover":
-            score = random.uniform(0.55, 0.62)  # Moving average is a simple baseline
+            score = rng.uniform(0.55, 0.62)  # Moving average is a simple baseline
         else:
-            score = random.uniform(0.50, 0.70)  # Unknown model
+            score = rng.uniform(0.50, 0.70)  # Unknown model
         
         model_scores[model] = round(score, 2)
     
@@ -85,7 +104,7 @@ def generate_mock_prediction(ticker: str, horizon: str, models: List[str]) -> Di
     best_model = max(model_scores, key=model_scores.get)
     
     # Determine prediction direction (slightly biased towards up for a more positive user experience)
-    prediction = "up" if random.random() > 0.45 else "down"
+    prediction = "up" if rng.random() > 0.45 else "down"
     
     # Confidence based on best model score
     confidence = model_scores[best_model]
@@ -104,7 +123,7 @@ def generate_mock_prediction(ticker: str, horizon: str, models: List[str]) -> Di
 def generate_mock_metrics(ticker: str) -> Dict[str, Any]:
     """Generate mock model performance metrics"""
     # Seed random with ticker to get consistent results
-    random.seed(sum(ord(c) for c in ticker))
+    rng = random.Random(sum(ord(c) for c in ticker))
     
     # Generate metrics for different models
     models = ["xgboost", "lstm", "arima", "ma_crossover"]
@@ -112,21 +131,21 @@ def generate_mock_metrics(ticker: str) -> Dict[str, Any]:
     
     for model in models:
         if model == "xgboost":
-            accuracy = random.uniform(0.68, 0.74)
-            precision = random.uniform(0.65, 0.75)
-            recall = random.uniform(0.65, 0.75)
+            accuracy = rng.uniform(0.68, 0.74)
+            precision = rng.uniform(0.65, 0.75)
+            recall = rng.uniform(0.65, 0.75)
         elif model == "lstm":
-            accuracy = random.uniform(0.67, 0.73)
-            precision = random.uniform(0.64, 0.74)
-            recall = random.uniform(0.64, 0.74)
+            accuracy = rng.uniform(0.67, 0.73)
+            precision = rng.uniform(0.64, 0.74)
+            recall = rng.uniform(0.64, 0.74)
         elif model == "arima":
-            accuracy = random.uniform(0.60, 0.65)
-            precision = random.uniform(0.58, 0.68)
-            recall = random.uniform(0.58, 0.68)
+            accuracy = rng.uniform(0.60, 0.65)
+            precision = rng.uniform(0.58, 0.68)
+            recall = rng.uniform(0.58, 0.68)
         elif model == "ma_crossover":
-            accuracy = random.uniform(0.55, 0.62)
-            precision = random.uniform(0.53, 0.63)
-            recall = random.uniform(0.53, 0.63)
+            accuracy = rng.uniform(0.55, 0.62)
+            precision = rng.uniform(0.53, 0.63)
+            recall = rng.uniform(0.53, 0.63)
         
         metrics[model] = {
             "accuracy": round(accuracy, 2),
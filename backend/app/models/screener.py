@@ -0,0 +1,233 @@
+import threading
+from collections import namedtuple
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.cache import cache, dump_arrays, load_arrays
+from app.core.config import settings
+from app.models.mock_data import MOCK_STOCKS, generate_mock_bar_series, generate_mock_prediction
+
+# Columns of the universe matrix, in order. Every field is stored as float64 so a
+# whole filter/sort expression can be evaluated column-wise in one pass.
+UNIVERSE_FIELDS = (
+    "close",
+    "change_1d_pct",
+    "change_5d_pct",
+    "volume",
+    "avg_volume_20",
+    "sma_20",
+    "sma_50",
+    "rsi_14",
+    "volatility_20",
+    "pred_1d_up",
+    "pred_1d_confidence",
+    "pred_5d_up",
+    "pred_5d_confidence",
+)
+FIELD_INDEX = {name: i for i, name in enumerate(UNIVERSE_FIELDS)}
+
+# Comparison operators allowed in screen filters
+FILTER_OPS = {
+    "lt": np.less,
+    "lte": np.less_equal,
+    "gt": np.greater,
+    "gte": np.greater_equal,
+    "eq": np.equal,
+    "ne": np.not_equal,
+}
+
+# Immutable view of the universe; refreshes swap in a new one atomically
+# source_version is the shared-cache "universe" version the matrix was built from
+UniverseSnapshot = namedtuple("UniverseSnapshot", ["tickers", "values", "as_of", "version", "source_version"])
+
+
+class TickerUniverse:
+    """Tickers x fields matrix of indicator, price and prediction values"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = UniverseSnapshot(
+            tickers=np.empty(0, dtype=object),
+            values=np.empty((0, len(UNIVERSE_FIELDS))),
+            as_of=None,
+            version=0,
+            source_version=None,
+        )
+
+    @property
+    def snapshot(self) -> UniverseSnapshot:
+        return self._snapshot
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._snapshot.as_of is not None
+
+    def load(self, tickers: Sequence[str], values: np.ndarray, source_version: Optional[int] = None) -> UniverseSnapshot:
+        """Replace the universe with a freshly computed matrix"""
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        if values.shape != (len(tickers), len(UNIVERSE_FIELDS)):
+            raise ValueError(f"Expected a {len(tickers)}x{len(UNIVERSE_FIELDS)} matrix, got {values.shape}")
+
+        with self._lock:
+            self._snapshot = UniverseSnapshot(
+                tickers=np.asarray(tickers, dtype=object),
+                values=values,
+                as_of=datetime.utcnow(),
+                version=self._snapshot.version + 1,
+                source_version=source_version,
+            )
+            return self._snapshot
+
+    def screen(
+        self,
+        filters: Sequence[Tuple[str, str, float]] = (),
+        sort_by: Optional[str] = None,
+        descending: bool = True,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> Tuple[int, List[Dict[str, Any]], UniverseSnapshot]:
+        """Filter and rank the universe, returning (total matches, page rows, snapshot)"""
+        snap = self._snapshot
+        values = snap.values
+
+        # Combine all filters into one boolean mask over the universe
+        # A missing (NaN) value never matches, whatever the operator
+        mask = np.ones(len(snap.tickers), dtype=bool)
+        for field, op, value in filters:
+            column = values[:, FIELD_INDEX[field]]
+            with np.errstate(invalid="ignore"):
+                mask &= FILTER_OPS[op](column, value) & ~np.isnan(column)
+        matched = np.flatnonzero(mask)
+        total = len(matched)
+
+        # Only the first offset + limit rows are ever ordered
+        k = min(offset + limit, total)
+        if sort_by is not None and k > 0:
+            keys = values[matched, FIELD_INDEX[sort_by]]
+            # NaNs always sort last; negate for descending so one ascending pass works
+            keys = np.where(np.isnan(keys), np.inf, -keys if descending else keys)
+            # Ties are broken by row position so every offset sees the same total order
+            if k < total:
+                # argpartition splits ties at the boundary arbitrarily, so take every row up
+                # to and including the k-th key before ordering
+                boundary = keys[np.argpartition(keys, k - 1)[k - 1]]
+                top = np.flatnonzero(keys <= boundary)
+                top = top[np.lexsort((top, keys[top]))][:k]
+            else:
+                top = np.lexsort((np.arange(total), keys))
+            page = matched[top[offset:k]]
+        else:
+            page = matched[offset:k]
+
+        rows = []
+        for i in page:
+            row = {"ticker": snap.tickers[i]}
+            for name, value in zip(UNIVERSE_FIELDS, values[i].tolist()):
+                row[name] = None if value != value else value
+            rows.append(row)
+        return total, rows, snap
+
+
+def _rolling_mean(matrix: np.ndarray, window: int) -> np.ndarray:
+    """Mean of the last `window` columns of each row, NaN when there is too little history"""
+    if matrix.shape[1] < window:
+        return np.full(matrix.shape[0], np.nan)
+    return matrix[:, -window:].mean(axis=1)
+
+
+def _rsi(closes: np.ndarray, window: int = 14) -> np.ndarray:
+    """Simple-average RSI over the last `window` price changes of each row"""
+    if closes.shape[1] <= window:
+        return np.full(closes.shape[0], np.nan)
+    deltas = np.diff(closes[:, -(window + 1):], axis=1)
+    gains = np.clip(deltas, 0, None).mean(axis=1)
+    losses = np.clip(-deltas, 0, None).mean(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + gains / losses)
+    return np.where(losses == 0, 100.0, rsi)
+
+
+def compute_universe_values(closes: np.ndarray, volumes: np.ndarray, predictions: np.ndarray) -> np.ndarray:
+    """Build the universe matrix from aligned (tickers x bars) closes/volumes and prediction columns
+
+    `predictions` is (tickers x 4): pred_1d_up, pred_1d_confidence, pred_5d_up, pred_5d_confidence.
+    """
+    values = np.full((closes.shape[0], len(UNIVERSE_FIELDS)), np.nan)
+    if closes.shape[1] == 0:
+        values[:, FIELD_INDEX["pred_1d_up"]:] = predictions
+        return values
+
+    last = closes[:, -1]
+    values[:, FIELD_INDEX["close"]] = last
+    if closes.shape[1] > 1:
+        values[:, FIELD_INDEX["change_1d_pct"]] = (last / closes[:, -2] - 1.0) * 100.0
+    if closes.shape[1] > 5:
+        values[:, FIELD_INDEX["change_5d_pct"]] = (last / closes[:, -6] - 1.0) * 100.0
+    values[:, FIELD_INDEX["volume"]] = volumes[:, -1]
+    values[:, FIELD_INDEX["avg_volume_20"]] = _rolling_mean(volumes, 20)
+    values[:, FIELD_INDEX["sma_20"]] = _rolling_mean(closes, 20)
+    values[:, FIELD_INDEX["sma_50"]] = _rolling_mean(closes, 50)
+    values[:, FIELD_INDEX["rsi_14"]] = _rsi(closes, 14)
+    if closes.shape[1] > 20:
+        returns = np.diff(closes[:, -21:], axis=1) / closes[:, -21:-1]
+        values[:, FIELD_INDEX["volatility_20"]] = returns.std(axis=1) * 100.0
+    values[:, FIELD_INDEX["pred_1d_up"]:] = predictions
+    return values
+
+
+# Shared universe used by the screener endpoint
+universe = TickerUniverse()
+
+
+def build_universe() -> Tuple[List[str], np.ndarray]:
+    """Compute (tickers, values) for the whole universe"""
+    # In a real implementation, this would read the latest bars and predictions from the database
+    # For now, we'll derive everything from the mock generators
+    tickers = [stock["ticker"] for stock in MOCK_STOCKS]
+    histories = [generate_mock_bar_series(ticker, "6m").bars for ticker in tickers]
+    bars = min(len(history) for history in histories) if histories else 0
+
+    # Align on the most recent `bars` bars of every ticker
+    closes = np.empty((len(tickers), bars))
+    volumes = np.empty((len(tickers), bars))
+    for i, history in enumerate(histories):
+        closes[i] = history["close"][len(history) - bars:]
+        volumes[i] = history["volume"][len(history) - bars:]
+
+    model_list = ["xgboost", "lstm", "ma_crossover"]
+    predictions = np.full((len(tickers), 4), np.nan)
+    for i, ticker in enumerate(tickers):
+        for j, horizon in enumerate(("1d", "5d")):
+            prediction = generate_mock_prediction(ticker, horizon, model_list)
+            predictions[i, 2 * j] = 1.0 if prediction["prediction"] == "up" else 0.0
+            predictions[i, 2 * j + 1] = prediction["confidence"]
+
+    return tickers, compute_universe_values(closes, volumes, predictions)
+
+
+def _dump_universe(tickers: Sequence[str], values: np.ndarray) -> bytes:
+    return dump_arrays(tickers=np.asarray(tickers, dtype=str), values=values)
+
+
+def refresh_universe() -> UniverseSnapshot:
+    """Rebuild the universe and publish it to other workers; call after each ingestion or prediction cycle"""
+    version = cache.bump_version("universe")
+    tickers, values = build_universe()
+    cache.set(cache.versioned_key("universe", "matrix"), _dump_universe(tickers, values), settings.CACHE_TTL_SECONDS)
+    return universe.load(tickers, values, source_version=version)
+
+
+def load_shared_universe() -> UniverseSnapshot:
+    """Load the current universe from the shared cache, building it in one worker if it is missing"""
+    version = cache.version("universe")
+    if universe.is_loaded and universe.snapshot.source_version == version:
+        return universe.snapshot
+
+    def fill() -> bytes:
+        return _dump_universe(*build_universe())
+
+    data = cache.get_or_fill(cache.versioned_key("universe", "matrix"), fill, settings.CACHE_TTL_SECONDS)
+    arrays = load_arrays(data)
+    return universe.load(arrays["tickers"].tolist(), arrays["values"], source_version=version)
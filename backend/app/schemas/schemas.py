@@ -1,7 +1,10 @@
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, EmailStr, Field, field_validator
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Literal
 from datetime import datetime
 
+if TYPE_CHECKING:
+    from app.models.bars import BarSeries
+
 # User schemas
 class UserBase(BaseModel):
     email: EmailStr
@@ -42,6 +45,22 @@ class StockHistoricalData(BaseModel):
     ticker: str
     data: List[StockDataPoint]
 
+class StockHistorySeries(BaseModel):
+    """History as one BarSeries, validated as a whole instead of one StockDataPoint per bar"""
+    ticker: str
+    # A BarSeries, checked in the validator so importing the schemas doesn't load NumPy
+    bars: Any
+
+    @field_validator("bars")
+    @classmethod
+    def validate_bars(cls, bars: "BarSeries") -> "BarSeries":
+        from app.models.bars import BarSeries
+
+        if not isinstance(bars, BarSeries):
+            raise ValueError("bars must be a BarSeries")
+        bars.validate()
+        return bars
+
 # Prediction schemas
 class ModelScore(BaseModel):
     accuracy: float
@@ -64,6 +83,48 @@ class PredictionResponse(BaseModel):
     model_scores: Dict[str, float]
     best_model: str
 
+class PredictionLogEntry(BaseModel):
+    id: int
+    ticker: str
+    horizon: str
+    prediction_date: datetime
+    target_date: Optional[datetime] = None
+    prediction: str
+    confidence: float
+    model_name: str
+    actual_result: Optional[str] = None
+    was_correct: Optional[bool] = None
+
+    class Config:
+        from_attributes = True
+
+class PredictionLogPage(BaseModel):
+    items: List[PredictionLogEntry]
+    next_cursor: Optional[str] = None
+
+# Screener schemas
+class ScreenFilter(BaseModel):
+    field: str
+    op: Literal["lt", "lte", "gt", "gte", "eq", "ne"]
+    value: float
+
+class ScreenSort(BaseModel):
+    field: str
+    order: Literal["asc", "desc"] = "desc"
+
+class ScreenRequest(BaseModel):
+    filters: List[ScreenFilter] = []
+    sort: Optional[ScreenSort] = None
+    offset: int = Field(0, ge=0)
+    limit: int = Field(50, ge=1, le=1000)
+
+class ScreenResponse(BaseModel):
+    total: int
+    offset: int
+    limit: int
+    as_of: Optional[datetime]
+    results: List[Dict[str, Any]]
+
 # Watchlist schemas
 class WatchlistItemBase(BaseModel):
     ticker: str
@@ -80,4 +141,34 @@ class WatchlistItem(WatchlistItemBase):
         orm_mode = True
 
 class WatchlistResponse(BaseModel):
-    items: List[WatchlistItemBase]
\ No newline at end of file
+    items: List[WatchlistItemBase]
+
+# Job schemas
+class JobCreate(BaseModel):
+    job_type: str
+    payload: Dict[str, Any] = {}
+    priority: int = Field(0, ge=-10, le=10)  # above JOB_MAX_USER_PRIORITY needs an admin
+    idempotency_key: Optional[str] = Field(None, max_length=128)
+    max_attempts: int = Field(3, ge=1, le=10)
+
+class JobResponse(BaseModel):
+    id: int
+    job_type: str
+    status: str
+    priority: int
+    payload: Dict[str, Any]
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    progress: float
+    progress_message: Optional[str] = None
+    attempts: int
+    max_attempts: int
+    idempotency_key: Optional[str] = None
+    user_id: Optional[int] = None
+    cancel_requested: bool
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
\ No newline at end of file
@@ -0,0 +1,71 @@
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from app.models.bars import BarSeries
+from app.schemas.schemas import StockDataPoint, StockHistorySeries
+
+# Compare the old per-bar dict path with the BarSeries path for the history endpoint:
+#   before: build a dict per bar, validate each against StockDataPoint, json.dumps the list
+#   after:  fill column arrays, validate the series once, serialize straight from the arrays
+#
+# Run from the backend directory:  python bench_history.py
+
+SIZES = [1000, 10000]
+REPEAT = 5
+
+
+def make_columns(n: int):
+    rng = np.random.default_rng(42)
+    dates = np.datetime64("2000-01-03") + np.arange(n)
+    close = np.round(100 * np.cumprod(1 + rng.uniform(-0.03, 0.03, n)), 2)
+    open_ = np.round(close * (1 + rng.uniform(-0.01, 0.01, n)), 2)
+    high = np.round(np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, n)), 2)
+    low = np.round(np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, n)), 2)
+    volume = rng.integers(100000, 10000000, n)
+    return (
+        np.datetime_as_string(dates).tolist(),
+        open_.tolist(), high.tolist(), low.tolist(), close.tolist(), volume.tolist()
+    )
+
+
+def before(columns) -> bytes:
+    dates, opens, highs, lows, closes, volumes = columns
+    data = [
+        {"date": d, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for d, o, h, l, c, v in zip(dates, opens, highs, lows, closes, volumes)
+    ]
+    [StockDataPoint(**bar) for bar in data]
+    return json.dumps(data).encode()
+
+
+def after(columns) -> bytes:
+    series = BarSeries.from_columns("BENCH", *columns)
+    return StockHistorySeries(ticker="BENCH", bars=series).bars.to_json()
+
+
+def measure(func, columns):
+    # Best-of-N wall time, then peak traced allocation for a single call
+    best = float("inf")
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        body = func(columns)
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    func(columns)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, body
+
+
+if __name__ == "__main__":
+    print(f"{'bars':>6}  {'path':<7} {'time (ms)':>10} {'peak alloc (KiB)':>17} {'bytes/bar':>10}")
+    for n in SIZES:
+        columns = make_columns(n)
+        results = {name: measure(func, columns) for name, func in [("before", before), ("after", after)]}
+        assert json.loads(results["before"][2]) == json.loads(results["after"][2])
+        for name, (seconds, peak, _) in results.items():
+            print(f"{n:>6}  {name:<7} {seconds * 1000:>10.2f} {peak / 1024:>17.1f} {peak / n:>10.0f}")
@@ -0,0 +1,55 @@
+import os
+import tempfile
+
+import pytest
+
+# Point settings at throwaway locations before anything imports app.core.config
+_tmp = tempfile.mkdtemp(prefix="stock-api-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_tmp}/test.db")
+os.environ.setdefault("CACHE_DIR", os.path.join(_tmp, "cache"))
+os.environ.setdefault("STARTUP_LOCK_FILE", os.path.join(_tmp, ".startup.lock"))
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+
+@pytest.fixture(scope="session")
+def migrated():
+    from app.db.init_db import init_db
+
+    init_db()
+
+
+@pytest.fixture
+def db(migrated):
+    from app.db.database import SessionLocal
+    from app.db.models import Job, PredictionResult, PredictionRollup, StockData
+
+    session = SessionLocal()
+    yield session
+    session.rollback()
+    for model in (Job, PredictionResult, PredictionRollup, StockData):
+        session.query(model).delete()
+    session.commit()
+    session.close()
+
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def register(client):
+    """Register a user and return Authorization headers for them"""
+    def register_user(email: str):
+        response = client.post(
+            "/api/auth/register", json={"email": email, "name": email.split("@")[0], "password": "password123"}
+        )
+        assert response.status_code == 200, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return register_user
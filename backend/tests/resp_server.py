@@ -0,0 +1,104 @@
+import socketserver
+import threading
+import time
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Speaks just enough RESP for RedisCacheBackend: AUTH, SELECT, GET, SET [NX] [PX], DEL, INCR"""
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        assert line.startswith(b"*"), line
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _reply(self, value):
+        if value is None:
+            self.wfile.write(b"$-1\r\n")
+        elif isinstance(value, int):
+            self.wfile.write(b":%d\r\n" % value)
+        elif isinstance(value, str):
+            self.wfile.write(b"+%s\r\n" % value.encode())
+        else:
+            self.wfile.write(b"$%d\r\n%s\r\n" % (len(value), value))
+
+    def _get(self, key):
+        item = self.server.data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires and expires < time.time():
+            del self.server.data[key]
+            return None
+        return value
+
+    def handle(self):
+        server = self.server
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            name, rest = args[0].upper(), args[1:]
+            server.commands.append([name] + rest)
+            with server.lock:
+                if name == b"AUTH":
+                    if rest[0] != server.password:
+                        self.wfile.write(b"-WRONGPASS invalid password\r\n")
+                        continue
+                    self._reply("OK")
+                elif name == b"SELECT":
+                    self._reply("OK")
+                elif name == b"GET":
+                    self._reply(self._get(rest[0]))
+                elif name == b"SET":
+                    key, value, options = rest[0], rest[1], [o.upper() for o in rest[2:]]
+                    if b"NX" in options and self._get(key) is not None:
+                        self._reply(None)
+                        continue
+                    expires = 0.0
+                    if b"PX" in options:
+                        expires = time.time() + int(options[options.index(b"PX") + 1]) / 1000
+                    server.data[key] = (value, expires)
+                    self._reply("OK")
+                elif name == b"DEL":
+                    self._reply(int(server.data.pop(rest[0], None) is not None))
+                elif name == b"INCR":
+                    value = int(self._get(rest[0]) or 0) + 1
+                    server.data[rest[0]] = (str(value).encode(), 0.0)
+                    self._reply(value)
+                else:
+                    self.wfile.write(b"-ERR unknown command\r\n")
+
+
+class RESPServer(socketserver.ThreadingTCPServer):
+    """In-process stand-in for a Redis server, for exercising RedisCacheBackend"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, password=None):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.password = password.encode() if password else None
+        self.data = {}
+        self.commands = []
+        self.lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address
+        auth = f":{self.password.decode()}@" if self.password else ""
+        return f"redis://{auth}{host}:{port}/2"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,27 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from app.models.bars import BarSeries
+from app.schemas.schemas import StockHistorySeries
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_importing_the_app_does_not_load_numpy():
+    code = "import sys, app.main; sys.exit('numpy' in sys.modules)"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=os.environ.copy())
+    assert result.returncode == 0
+
+
+def test_history_series_validates_bars():
+    series = BarSeries.from_columns("T", ["2024-01-02", "2024-01-03"], [1, 2], [2, 3], [0.5, 1.5], [1.5, 2.5], [10, 20])
+    assert StockHistorySeries(ticker="T", bars=series).bars is series
+
+    unsorted = BarSeries.from_columns("T", ["2024-01-03", "2024-01-02"], [1, 2], [2, 3], [0.5, 1.5], [1.5, 2.5], [1, 2])
+    with pytest.raises(ValueError, match="strictly increasing"):
+        StockHistorySeries(ticker="T", bars=unsorted)
+    with pytest.raises(ValueError, match="must be a BarSeries"):
+        StockHistorySeries(ticker="T", bars=[{"date": "2024-01-02"}])
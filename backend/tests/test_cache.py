@@ -0,0 +1,183 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.core.cache import (
+    FileCacheBackend, MemoryCacheBackend, RedisCacheBackend, SharedCache, dump_arrays, load_arrays
+)
+from resp_server import RESPServer
+
+
+@pytest.fixture
+def resp_server():
+    with RESPServer(password="secret") as server:
+        yield server
+
+
+@pytest.fixture(params=["memory", "file", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCacheBackend(max_bytes=1 << 20)
+    elif request.param == "file":
+        yield FileCacheBackend(str(tmp_path / "cache"), max_bytes=1 << 20)
+    else:
+        with RESPServer() as server:
+            yield RedisCacheBackend(server.url)
+
+
+def test_set_get_delete(backend):
+    assert backend.get("k") is None
+    backend.set("k", b"value")
+    assert backend.get("k") == b"value"
+    backend.set("k", b"other")
+    assert backend.get("k") == b"other"
+    backend.delete("k")
+    assert backend.get("k") is None
+
+
+def test_values_expire(backend):
+    backend.set("k", b"value", ttl=0.05)
+    assert backend.get("k") == b"value"
+    time.sleep(0.1)
+    assert backend.get("k") is None
+
+
+def test_add_only_sets_missing_or_expired_keys(backend):
+    assert backend.add("lock", b"1", ttl=0.05)
+    assert not backend.add("lock", b"2", ttl=0.05)
+    time.sleep(0.1)
+    # An expired lock (e.g. left by a crashed worker) can be taken again
+    assert backend.add("lock", b"3", ttl=10)
+    assert backend.get("lock") == b"3"
+
+
+def test_incr(backend):
+    assert backend.incr("counter") == 1
+    assert backend.incr("counter") == 2
+    assert int(backend.get("counter")) == 2
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_bytes=30)
+    backend.set("a", b"x" * 10)
+    backend.set("b", b"x" * 10)
+    backend.set("c", b"x" * 10)
+    backend.get("a")
+    backend.set("d", b"x" * 10)
+    assert backend.get("b") is None
+    assert backend.get("a") is not None
+    assert backend.size <= 30
+
+
+def test_file_backend_evicts_least_recently_used(tmp_path):
+    backend = FileCacheBackend(str(tmp_path), max_bytes=1 << 20)
+    now = time.time()
+    for i in range(8):
+        backend.set(f"k{i}", b"x" * 2048)
+        # Spread out the mtimes so the LRU order is unambiguous
+        os.utime(backend._path(f"k{i}"), (now - 100 + i, now - 100 + i))
+    backend.get("k0")
+    backend.max_bytes = 10 * 1024
+    backend.evict()
+    assert backend.get("k0") is not None
+    assert backend.get("k1") is None
+    total = sum(entry.stat().st_size for entry in os.scandir(tmp_path) if not entry.name.startswith("."))
+    assert total <= 10 * 1024
+
+
+def test_file_backend_shared_between_instances(tmp_path):
+    # Two backends over one directory stand in for two worker processes
+    first = FileCacheBackend(str(tmp_path), max_bytes=1 << 20)
+    second = FileCacheBackend(str(tmp_path), max_bytes=1 << 20)
+    first.set("k", b"value")
+    assert second.get("k") == b"value"
+    assert first.incr("n") == 1
+    assert second.incr("n") == 2
+
+
+def test_redis_backend_auth_and_select(resp_server):
+    backend = RedisCacheBackend(resp_server.url)
+    backend.set("k", b"\r\nbinary\x00", ttl=5)
+    assert backend.get("k") == b"\r\nbinary\x00"
+    assert resp_server.commands[0] == [b"AUTH", b"secret"]
+    assert resp_server.commands[1] == [b"SELECT", b"2"]
+
+
+def test_redis_backend_reconnects_after_server_drops_connection(resp_server):
+    backend = RedisCacheBackend(resp_server.url)
+    backend.set("k", b"value")
+    backend._local.sock.close()
+    assert backend.get("k") == b"value"
+
+
+def test_redis_backend_raises_server_errors():
+    with RESPServer(password="secret") as server:
+        backend = RedisCacheBackend(server.url.replace("secret", "wrong"))
+        with pytest.raises(RuntimeError, match="WRONGPASS"):
+            backend.get("k")
+
+
+def test_bump_version_changes_versioned_keys(backend):
+    cache = SharedCache(backend)
+    assert cache.versioned_key("ticker:AAPL", "history", "1y") == "ticker:AAPL:v0:history:1y"
+    cache.set(cache.versioned_key("ticker:AAPL", "history"), b"old")
+    assert cache.bump_version("ticker:AAPL") == 1
+    assert cache.get(cache.versioned_key("ticker:AAPL", "history")) is None
+    assert cache.version("ticker:MSFT") == 0
+
+
+def test_get_or_fill_fills_once_under_concurrency(backend):
+    cache = SharedCache(backend)
+    calls = []
+    started = threading.Barrier(8)
+
+    def fill():
+        calls.append(1)
+        time.sleep(0.1)
+        return b"computed"
+
+    results = []
+
+    def reader():
+        started.wait()
+        results.append(cache.get_or_fill("key", fill, ttl=10))
+
+    threads = [threading.Thread(target=reader) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [b"computed"] * 8
+    assert len(calls) == 1
+    # The stampede lock is released once the value is stored
+    assert backend.get("stock-api:lock:key") is None
+
+
+def test_get_or_fill_releases_lock_when_fill_fails(backend):
+    cache = SharedCache(backend)
+
+    def fill():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError):
+        cache.get_or_fill("key", fill)
+    assert cache.get_or_fill("key", lambda: b"ok") == b"ok"
+
+
+def test_get_or_fill_computes_without_caching_when_lock_is_stuck(backend):
+    cache = SharedCache(backend)
+    backend.add("stock-api:lock:key", b"1", 60)
+    assert cache.get_or_fill("key", lambda: b"fallback", wait=0.05) == b"fallback"
+    assert cache.get("key") is None
+
+
+def test_array_round_trip():
+    tickers = np.array(["AAPL", "MSFT"])
+    values = np.arange(6, dtype=np.float64).reshape(2, 3)
+    arrays = load_arrays(dump_arrays(tickers=tickers, values=values))
+    assert arrays["tickers"].tolist() == ["AAPL", "MSFT"]
+    np.testing.assert_array_equal(arrays["values"], values)
@@ -0,0 +1,181 @@
+import gzip
+from datetime import date
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core import compression
+from app.core.compression import CompressionMiddleware, cached_json_response, negotiate
+from app.core.config import settings
+
+BIG = b'{"values": [' + b",".join(b"%d" % i for i in range(2000)) + b"]}"
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),
+    ("gzip, br, zstd", "zstd"),
+    # Server preference wins among accepted encodings, whatever their q
+    ("gzip;q=1.0, br;q=0.1", "br"),
+    ("br;q=0, gzip", "gzip"),
+    ("zstd;q=0, br;q=0, gzip;q=0", None),
+    ("*", "zstd"),
+    ("*;q=0", None),
+    ("*, zstd;q=0", "br"),
+    ("GZIP;q=0.5", "gzip"),
+    ("gzip;q=oops", None),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header) == expected
+
+
+def test_negotiate_only_offers_installed_codecs(monkeypatch):
+    monkeypatch.setattr(compression, "ENCODINGS", ["gzip"])
+    assert negotiate("zstd, br") is None
+    assert negotiate("*") == "gzip"
+
+
+def _app(body=BIG, headers=None, chunks=None, status=200):
+    """ASGI app sending one JSON body, or the given chunks as a streaming response"""
+    async def app(scope, receive, send):
+        raw = [(b"content-type", b"application/json")] + [
+            (name.lower().encode(), value.encode()) for name, value in (headers or {}).items()
+        ]
+        await send({"type": "http.response.start", "status": status, "headers": raw})
+        if chunks is None:
+            await send({"type": "http.response.body", "body": body})
+            return
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+    return app
+
+
+def _get(app, path="/api/stocks/history", accept="gzip", **kwargs):
+    client = TestClient(CompressionMiddleware(app))
+    return client.get(path, headers={"Accept-Encoding": accept}, **kwargs)
+
+
+def test_compresses_large_json_and_sets_headers():
+    response = _get(_app(headers={"Vary": "Origin", "Content-Length": str(len(BIG))}))
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Origin, Accept-Encoding"
+    # The client decodes the body; the length header must match what went over the wire
+    assert response.content == BIG
+    assert int(response.headers["content-length"]) < len(BIG)
+
+
+def test_vary_is_not_duplicated():
+    response = _get(_app(headers={"Vary": "accept-encoding"}))
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "accept-encoding"
+
+
+def test_small_bodies_are_not_compressed():
+    small = b'{"ok": true}'
+    assert len(small) < settings.COMPRESSION_MIN_SIZE
+    response = _get(_app(body=small))
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.content == small
+
+
+def test_identity_clients_get_the_body_untouched():
+    response = _get(_app(), accept="identity")
+    assert "content-encoding" not in response.headers
+    assert "vary" not in response.headers
+    assert response.content == BIG
+
+
+def test_streaming_responses_pass_through():
+    chunks = [BIG[:2000], BIG[2000:]]
+    response = _get(_app(chunks=chunks))
+    assert "content-encoding" not in response.headers
+    assert response.content == BIG
+
+
+def test_encoded_and_non_json_responses_pass_through():
+    already = gzip.compress(BIG)
+    response = _get(_app(body=already, headers={"Content-Encoding": "gzip"}), accept="br")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == BIG
+
+    async def image(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"image/png")]})
+        await send({"type": "http.response.body", "body": BIG})
+
+    response = _get(image)
+    assert "content-encoding" not in response.headers
+    assert response.content == BIG
+
+
+@pytest.fixture
+def profiles(monkeypatch):
+    """Record the profile of every compression"""
+    used = []
+    compress = compression.compress
+
+    def record(body, encoding, profile="balanced"):
+        used.append(profile)
+        return compress(body, encoding, profile)
+
+    monkeypatch.setattr(compression, "compress", record)
+    return used
+
+
+def test_middleware_uses_the_fast_route_profile(profiles):
+    assert _get(_app(), path="/api/stocks/history").headers["content-encoding"] == "gzip"
+    assert _get(_app(), path="/api/other").headers["content-encoding"] == "gzip"
+    assert profiles == ["fast", settings.COMPRESSION_DEFAULT_PROFILE]
+
+
+def _cached_app(fill):
+    app = FastAPI()
+
+    @app.get("/data")
+    async def data(request: Request):
+        return await cached_json_response(request, "compression-test", ("data",), fill)
+
+    app.add_middleware(CompressionMiddleware)
+    return TestClient(app)
+
+
+def test_cached_variants_are_compressed_once_per_encoding(profiles):
+    fills = []
+    client = _cached_app(lambda: fills.append(1) or BIG)
+
+    for accept in ("gzip", "gzip", "br", "identity"):
+        response = client.get("/data", headers={"Accept-Encoding": accept})
+        assert response.status_code == 200
+        assert response.content == BIG
+        assert response.headers["vary"] == "Accept-Encoding"
+        if accept != "identity":
+            assert response.headers["content-encoding"] == accept
+            assert int(response.headers["content-length"]) < len(BIG)
+        else:
+            assert "content-encoding" not in response.headers
+
+    assert fills == [1]
+    # One "max" compression per encoding; the middleware leaves the encoded variants alone
+    assert profiles == [settings.COMPRESSION_CACHED_PROFILE] * 2
+    assert settings.COMPRESSION_CACHED_PROFILE == "max"
+
+
+def test_windowed_history_is_compressed_fast(client, profiles):
+    response = client.get(
+        "/api/stocks/history",
+        params={"ticker": "AAPL", "start": date(date.today().year - 1, 1, 1).isoformat()},
+        headers={"Accept-Encoding": "br"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "br"
+    assert profiles == ["fast"]
+
+    profiles.clear()
+    response = client.get("/api/stocks/history", params={"ticker": "AAPL"}, headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert profiles in ([], [settings.COMPRESSION_CACHED_PROFILE])
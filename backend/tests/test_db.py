@@ -0,0 +1,186 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from app.db.crud import upsert_stock_bars
+from app.db.migrations import MIGRATIONS, applied_versions, run_migrations
+from app.db.models import PredictionResult, PredictionRollup, StockData, WatchlistItem
+from app.db.retention import archive_resolved_predictions
+
+# Schema as created by the pre-migrations init_db (Base.metadata.create_all at the time)
+BASELINE_SCHEMA = """
+CREATE TABLE users (
+    id INTEGER NOT NULL PRIMARY KEY, name VARCHAR, email VARCHAR, hashed_password VARCHAR,
+    is_active BOOLEAN, created_at DATETIME, updated_at DATETIME
+);
+CREATE INDEX ix_users_id ON users (id);
+CREATE INDEX ix_users_name ON users (name);
+CREATE UNIQUE INDEX ix_users_email ON users (email);
+CREATE TABLE watchlist_items (
+    id INTEGER NOT NULL PRIMARY KEY, user_id INTEGER REFERENCES users (id), ticker VARCHAR, added_at DATETIME
+);
+CREATE INDEX ix_watchlist_items_id ON watchlist_items (id);
+CREATE INDEX ix_watchlist_items_ticker ON watchlist_items (ticker);
+CREATE TABLE stock_data (
+    id INTEGER NOT NULL PRIMARY KEY, ticker VARCHAR, date DATETIME, open FLOAT, high FLOAT, low FLOAT,
+    close FLOAT, volume INTEGER, last_updated DATETIME
+);
+CREATE INDEX ix_stock_data_id ON stock_data (id);
+CREATE INDEX ix_stock_data_ticker ON stock_data (ticker);
+CREATE INDEX ix_stock_data_date ON stock_data (date);
+CREATE TABLE prediction_results (
+    id INTEGER NOT NULL PRIMARY KEY, ticker VARCHAR, prediction_date DATETIME, target_date DATETIME,
+    horizon VARCHAR, prediction VARCHAR, confidence FLOAT, model_name VARCHAR, actual_result VARCHAR,
+    was_correct BOOLEAN
+);
+CREATE INDEX ix_prediction_results_ticker ON prediction_results (ticker);
+CREATE INDEX ix_prediction_results_id ON prediction_results (id);
+CREATE TABLE model_metrics (
+    id INTEGER NOT NULL PRIMARY KEY, ticker VARCHAR, model_name VARCHAR, horizon VARCHAR, accuracy FLOAT,
+    precision_up FLOAT, recall_up FLOAT, f1_score FLOAT, validation_period VARCHAR, last_updated DATETIME
+);
+CREATE INDEX ix_model_metrics_horizon ON model_metrics (horizon);
+CREATE INDEX ix_model_metrics_id ON model_metrics (id);
+CREATE INDEX ix_model_metrics_model_name ON model_metrics (model_name);
+CREATE INDEX ix_model_metrics_ticker ON model_metrics (ticker);
+"""
+
+BASELINE_ROWS = """
+INSERT INTO users (id, name, email, is_active) VALUES (1, 'Demo', 'demo@example.com', 1);
+INSERT INTO watchlist_items (id, user_id, ticker) VALUES (1, 1, 'AAPL'), (2, 1, 'AAPL'), (3, 1, 'MSFT');
+INSERT INTO stock_data (id, ticker, date, close) VALUES
+    (1, 'AAPL', '2024-01-02 00:00:00', 1.0),
+    (2, 'AAPL', '2024-01-02 00:00:00', 2.0),
+    (3, 'AAPL', '2024-01-03 00:00:00', 3.0);
+INSERT INTO model_metrics (id, ticker, model_name, horizon, accuracy) VALUES
+    (1, 'AAPL', 'xgboost', '1d', 0.5),
+    (2, 'AAPL', 'xgboost', '1d', 0.7),
+    (3, 'AAPL', 'lstm', '1d', 0.6);
+"""
+
+
+@pytest.fixture
+def baseline_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        for statement in (BASELINE_SCHEMA + BASELINE_ROWS).split(";"):
+            if statement.strip():
+                conn.execute(text(statement))
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_upgrade_a_baseline_database(baseline_engine):
+    assert run_migrations(baseline_engine) == [version for version, _, _ in MIGRATIONS]
+    assert run_migrations(baseline_engine) == []
+    assert applied_versions(baseline_engine) == [version for version, _, _ in MIGRATIONS]
+
+    with baseline_engine.connect() as conn:
+        # Latest bar and metrics row kept, first watchlist entry kept
+        assert conn.execute(text("SELECT id, close FROM stock_data ORDER BY id")).all() == [(2, 2.0), (3, 3.0)]
+        assert conn.execute(text("SELECT id FROM model_metrics ORDER BY id")).scalars().all() == [2, 3]
+        assert conn.execute(text("SELECT id FROM watchlist_items ORDER BY id")).scalars().all() == [1, 3]
+
+    inspector = inspect(baseline_engine)
+    unique = {
+        table: {index["name"] for index in inspector.get_indexes(table) if index["unique"]}
+        for table in ("stock_data", "model_metrics", "watchlist_items")
+    }
+    assert "ux_stock_data_ticker_date" in unique["stock_data"]
+    assert "ux_model_metrics_ticker_model_horizon" in unique["model_metrics"]
+    assert "ux_watchlist_items_user_ticker" in unique["watchlist_items"]
+    prediction_indexes = {index["name"] for index in inspector.get_indexes("prediction_results")}
+    assert {"ix_prediction_results_ticker_horizon_date", "ix_prediction_results_ticker_horizon_model_date"} <= prediction_indexes
+    # Redundant single-column ticker indexes are dropped
+    assert "ix_prediction_results_ticker" not in prediction_indexes
+    assert "ix_stock_data_ticker" not in {index["name"] for index in inspector.get_indexes("stock_data")}
+    # Later tables and columns exist
+    assert {"prediction_rollups", "jobs", "schema_migrations"} <= set(inspector.get_table_names())
+    assert "user_id" in {column["name"] for column in inspector.get_columns("jobs")}
+    assert "is_admin" in {column["name"] for column in inspector.get_columns("users")}
+
+    with baseline_engine.begin() as conn, pytest.raises(IntegrityError):
+        conn.execute(text("INSERT INTO stock_data (ticker, date) VALUES ('AAPL', '2024-01-03 00:00:00')"))
+
+
+def test_migrations_on_an_empty_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    assert run_migrations(engine) == [version for version, _, _ in MIGRATIONS]
+    assert "jobs" in inspect(engine).get_table_names()
+    engine.dispose()
+
+
+def _bar(day, close):
+    return {"date": f"2024-01-{day:02d}", "open": close, "high": close, "low": close, "close": close, "volume": 100}
+
+
+def test_upsert_stock_bars_inserts_then_updates(db):
+    from app.core.cache import cache
+
+    version = cache.version("ticker:AAPL")
+    assert upsert_stock_bars(db, "aapl", [_bar(2, 1.0), _bar(3, 2.0)]) == 2
+    assert upsert_stock_bars(db, "AAPL", [_bar(3, 5.0), _bar(4, 6.0)]) == 2
+    assert upsert_stock_bars(db, "AAPL", []) == 0
+
+    rows = db.query(StockData.date, StockData.close).filter(StockData.ticker == "AAPL").order_by(StockData.date).all()
+    assert [(row.date.day, row.close) for row in rows] == [(2, 1.0), (3, 5.0), (4, 6.0)]
+    # Cached history for the ticker is invalidated
+    assert cache.version("ticker:AAPL") == version + 2
+
+
+def _prediction(when, correct, confidence, model_name="xgboost"):
+    return PredictionResult(
+        ticker="AAPL", horizon="1d", prediction="up", model_name=model_name, prediction_date=when,
+        confidence=confidence, was_correct=correct
+    )
+
+
+def test_archive_rolls_up_across_batches(db):
+    old = datetime.utcnow() - timedelta(days=400)
+    month = datetime(old.year, old.month, 1)
+    confidences = [0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 0.55]
+    correct = [True, False, True, True, False, True, False]
+    db.add_all([
+        _prediction(month + timedelta(hours=i), flag, confidence)
+        for i, (flag, confidence) in enumerate(zip(correct, confidences))
+    ])
+    recent = _prediction(datetime.utcnow(), True, 0.9)
+    unresolved = _prediction(old, None, 0.9)
+    db.add_all([recent, unresolved])
+    db.commit()
+
+    # Batches of 3 split the month's predictions across several merges
+    assert archive_resolved_predictions(db, older_than_days=365, batch_size=3) == len(confidences)
+
+    rollup = db.query(PredictionRollup).one()
+    assert (rollup.ticker, rollup.horizon, rollup.model_name, rollup.period_start) == ("AAPL", "1d", "xgboost", month)
+    assert rollup.predictions == len(confidences)
+    assert rollup.correct == sum(correct)
+    assert rollup.avg_confidence == pytest.approx(sum(confidences) / len(confidences))
+    remaining = {row.id for row in db.query(PredictionResult.id)}
+    assert remaining == {recent.id, unresolved.id}
+
+    # A later run merges into the existing rollup and keeps the mean exact
+    db.add(_prediction(month + timedelta(days=1), True, 0.1))
+    db.commit()
+    assert archive_resolved_predictions(db, older_than_days=365, batch_size=3) == 1
+    db.refresh(rollup)
+    assert rollup.predictions == len(confidences) + 1
+    assert rollup.correct == sum(correct) + 1
+    assert rollup.avg_confidence == pytest.approx((sum(confidences) + 0.1) / (len(confidences) + 1))
+
+
+def test_watchlist_rejects_duplicates(client, db, register):
+    headers = register("watchlist-dupes@example.com")
+    assert client.post("/api/watchlist/", json={"ticker": "aapl"}, headers=headers).status_code == 201
+    response = client.post("/api/watchlist/", json={"ticker": "AAPL"}, headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Stock already in watchlist"
+
+    # The unique index backs the API check, e.g. against concurrent adds
+    user_id = db.query(WatchlistItem.user_id).filter(WatchlistItem.ticker == "AAPL").scalar()
+    db.add(WatchlistItem(user_id=user_id, ticker="AAPL"))
+    with pytest.raises(IntegrityError):
+        db.commit()
@@ -0,0 +1,250 @@
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.db.models import Job, User
+from app.jobs import worker
+from app.jobs.queue import (
+    JobCancelled, JobLost, cancel_running_job, claim_next_job, complete_job, enqueue_job, fail_job, heartbeat,
+    report_progress, request_cancel, requeue_stale_jobs
+)
+from app.jobs.tasks import JOB_TYPES, JobType
+
+
+def _make_stale(db, job):
+    job.heartbeat_at = datetime.utcnow() - timedelta(seconds=settings.JOB_STALE_AFTER_SECONDS + 1)
+    db.commit()
+
+
+def test_enqueue_is_idempotent(db):
+    first = enqueue_job(db, "backfill_history", {"tickers": ["AAPL"]}, idempotency_key="nightly-1")
+    second = enqueue_job(db, "backfill_history", {"tickers": ["MSFT"]}, idempotency_key="nightly-1")
+    assert second.id == first.id
+    assert db.query(Job).count() == 1
+
+
+def test_claim_orders_by_priority_then_age(db):
+    low = enqueue_job(db, "backfill_history")
+    high = enqueue_job(db, "backfill_history", priority=5)
+    later_low = enqueue_job(db, "backfill_history")
+    caps = {"backfill_history": 10}
+    claimed = [claim_next_job(db, "w", caps).id for _ in range(3)]
+    assert claimed == [high.id, low.id, later_low.id]
+    assert claim_next_job(db, "w", caps) is None
+
+
+def test_claim_skips_jobs_waiting_for_retry(db):
+    job = enqueue_job(db, "backfill_history")
+    job.run_after = datetime.utcnow() + timedelta(minutes=1)
+    db.commit()
+    assert claim_next_job(db, "w", {"backfill_history": 1}) is None
+
+
+def test_claim_respects_concurrency_cap(db):
+    enqueue_job(db, "recompute_metrics")
+    enqueue_job(db, "recompute_metrics")
+    other = enqueue_job(db, "backfill_history")
+    caps = {"recompute_metrics": 1, "backfill_history": 1}
+    assert claim_next_job(db, "w1", caps).job_type == "recompute_metrics"
+    assert claim_next_job(db, "w2", caps).id == other.id
+    assert claim_next_job(db, "w3", caps) is None
+
+
+def test_claim_enforces_cap_even_when_the_pre_count_is_stale(db, monkeypatch):
+    first = enqueue_job(db, "recompute_metrics")
+    enqueue_job(db, "recompute_metrics")
+    assert claim_next_job(db, "w1", {"recompute_metrics": 1}).id == first.id
+
+    # Simulate a second worker that counted running jobs before the first claim committed
+    original_query = db.query
+
+    def query(*entities):
+        result = original_query(*entities)
+        if len(entities) == 2 and entities[1] is not Job.job_type:
+            return original_query(Job.job_type, Job.id).filter(Job.id < 0)
+        return result
+
+    monkeypatch.setattr(db, "query", query)
+    assert claim_next_job(db, "w2", {"recompute_metrics": 1}) is None
+
+
+def test_writes_from_a_stale_run_are_dropped(db):
+    job = enqueue_job(db, "backfill_history")
+    first = claim_next_job(db, "w1", {"backfill_history": 1})
+    first_attempt = first.attempts
+
+    _make_stale(db, first)
+    assert requeue_stale_jobs(db) == 1
+    second = claim_next_job(db, "w2", {"backfill_history": 1})
+    assert second.attempts == first_attempt + 1
+
+    # The original worker finally finishes; none of its writes may land
+    assert not heartbeat(db, job.id, "w1", first_attempt)
+    with pytest.raises(JobLost):
+        report_progress(db, job.id, "w1", first_attempt, 0.5)
+    assert not complete_job(db, job.id, "w1", first_attempt, {"from": "w1"})
+    assert not fail_job(db, job.id, "w1", first_attempt, "late failure")
+    assert not cancel_running_job(db, job.id, "w1", first_attempt)
+
+    assert complete_job(db, job.id, "w2", second.attempts, {"from": "w2"})
+    db.refresh(job)
+    assert job.status == "succeeded"
+    assert job.result == {"from": "w2"}
+
+
+def test_fail_retries_with_backoff_then_gives_up(db):
+    job = enqueue_job(db, "backfill_history", max_attempts=2)
+    claimed = claim_next_job(db, "w", {"backfill_history": 1})
+    assert fail_job(db, job.id, "w", claimed.attempts, "first")
+    db.refresh(job)
+    assert job.status == "queued"
+    assert job.worker_id is None
+    assert job.run_after > datetime.utcnow()
+
+    job.run_after = datetime.utcnow()
+    db.commit()
+    claimed = claim_next_job(db, "w", {"backfill_history": 1})
+    assert fail_job(db, job.id, "w", claimed.attempts, "second")
+    db.refresh(job)
+    assert job.status == "failed"
+    assert job.error == "second"
+    assert job.finished_at is not None
+
+
+def test_cancel_queued_and_running_jobs(db):
+    queued = enqueue_job(db, "backfill_history")
+    request_cancel(db, queued)
+    assert queued.status == "cancelled"
+
+    running = enqueue_job(db, "backfill_history")
+    claimed = claim_next_job(db, "w", {"backfill_history": 1})
+    request_cancel(db, running)
+    assert running.status == "running"
+    assert running.cancel_requested
+    with pytest.raises(JobCancelled):
+        report_progress(db, running.id, "w", claimed.attempts, 0.5)
+
+
+def test_requeue_stale_jobs(db):
+    lost = enqueue_job(db, "backfill_history", max_attempts=3)
+    exhausted = enqueue_job(db, "backfill_history", max_attempts=1)
+    cancelling = enqueue_job(db, "backfill_history")
+    for _ in range(3):
+        claim_next_job(db, "w", {"backfill_history": 3})
+    cancelling.cancel_requested = True
+    for job in (lost, exhausted, cancelling):
+        _make_stale(db, job)
+
+    assert requeue_stale_jobs(db) == 1
+    for job in (lost, exhausted, cancelling):
+        db.refresh(job)
+    assert lost.status == "queued"
+    assert exhausted.status == "failed"
+    assert cancelling.status == "cancelled"
+
+
+@pytest.fixture
+def test_task(monkeypatch):
+    calls = []
+
+    def run(db, payload, progress):
+        calls.append(payload)
+        if payload.get("fail"):
+            raise RuntimeError("task failed")
+        progress(0.5, "halfway")
+        return {"echo": payload.get("value")}
+
+    monkeypatch.setitem(JOB_TYPES, "test_task", JobType(run, 1))
+    return calls
+
+
+def test_worker_runs_job_to_completion(db, test_task):
+    job = enqueue_job(db, "test_task", {"value": 42})
+    assert worker.run_one("w")
+    db.refresh(job)
+    assert job.status == "succeeded"
+    assert job.result == {"echo": 42}
+    assert job.progress == 1.0
+    assert not worker.run_one("w")
+
+
+def test_worker_records_failures_for_retry(db, test_task):
+    job = enqueue_job(db, "test_task", {"fail": True})
+    assert worker.run_one("w")
+    db.refresh(job)
+    assert job.status == "queued"
+    assert "task failed" in job.error
+
+
+def test_worker_heartbeats_while_the_task_runs(db, monkeypatch):
+    monkeypatch.setattr(settings, "JOB_HEARTBEAT_SECONDS", 0.02)
+    seen = []
+
+    def slow(task_db, payload, progress):
+        # Never reports progress; only the heartbeat thread keeps the job alive
+        started = db.query(Job.heartbeat_at).filter(Job.id == job.id).scalar()
+        time.sleep(0.2)
+        db.expire_all()
+        seen.append(db.query(Job.heartbeat_at).filter(Job.id == job.id).scalar() > started)
+        return {}
+
+    monkeypatch.setitem(JOB_TYPES, "slow_task", JobType(slow, 1))
+    job = enqueue_job(db, "slow_task")
+    assert worker.run_one("w")
+    assert seen == [True]
+
+
+def test_jobs_api_ownership(client, db, register):
+    alice = register("alice-jobs@example.com")
+    bob = register("bob-jobs@example.com")
+
+    response = client.post("/api/jobs/", json={"job_type": "backfill_history", "idempotency_key": "alice-1"},
+                           headers=alice)
+    assert response.status_code == 202
+    job_id = response.json()["id"]
+    assert response.headers["location"] == f"/api/jobs/{job_id}"
+
+    assert client.get(f"/api/jobs/{job_id}", headers=alice).status_code == 200
+    assert client.get(f"/api/jobs/{job_id}", headers=bob).status_code == 404
+    assert client.post(f"/api/jobs/{job_id}/cancel", headers=bob).status_code == 404
+    # Another user's idempotency key doesn't hand back their job
+    response = client.post("/api/jobs/", json={"job_type": "backfill_history", "idempotency_key": "alice-1"},
+                           headers=bob)
+    assert response.status_code == 409
+
+    response = client.post(f"/api/jobs/{job_id}/cancel", headers=alice)
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert client.post(f"/api/jobs/{job_id}/cancel", headers=alice).status_code == 409
+
+
+def test_jobs_api_priority_bounds(client, db, register):
+    user = register("carol-jobs@example.com")
+    too_high = {"job_type": "backfill_history", "priority": settings.JOB_MAX_USER_PRIORITY + 1}
+    assert client.post("/api/jobs/", json=too_high, headers=user).status_code == 403
+    assert client.post("/api/jobs/", json={**too_high, "priority": 1000}, headers=user).status_code == 422
+
+    db.query(User).filter(User.email == "carol-jobs@example.com").update({"is_admin": True})
+    db.commit()
+    assert client.post("/api/jobs/", json=too_high, headers=user).status_code == 202
+
+
+def test_cancel_racing_a_claim_does_not_overwrite_running(db):
+    job = enqueue_job(db, "backfill_history")
+    # The API read the job while it was queued...
+    assert job.status == "queued"
+    # ...then a worker claimed it before the cancel was written
+    worker_db = type(db)(bind=db.get_bind())
+    claimed = claim_next_job(worker_db, "w", {"backfill_history": 1})
+    worker_db.close()
+
+    request_cancel(db, job)
+    assert job.status == "running"
+    assert job.cancel_requested
+    with pytest.raises(JobCancelled):
+        report_progress(db, job.id, "w", claimed.attempts, 0.5)
+    assert cancel_running_job(db, job.id, "w", claimed.attempts)
+    db.refresh(job)
+    assert job.status == "cancelled"
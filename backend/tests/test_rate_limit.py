@@ -0,0 +1,133 @@
+import sqlite3
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.auth import create_access_token
+from app.core.config import settings
+from app.core.rate_limit import (
+    PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL, PRIORITY_SHED_AT, MemoryBucketBackend, RateLimitMiddleware,
+    SQLiteBucketBackend
+)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBucketBackend()
+    return SQLiteBucketBackend(str(tmp_path / "buckets.db"))
+
+
+def test_bucket_allows_burst_then_reports_wait(backend):
+    # 1 token per second, burst of 3
+    assert [backend.take("k", 1.0, 3) for _ in range(3)] == [0.0, 0.0, 0.0]
+    wait = backend.take("k", 1.0, 3)
+    assert 0.9 < wait <= 1.0
+    # Other keys have their own bucket
+    assert backend.take("other", 1.0, 3) == 0.0
+
+
+def test_bucket_refills_over_time(backend):
+    for _ in range(2):
+        backend.take("k", 20.0, 2)
+    assert backend.take("k", 20.0, 2) > 0
+    time.sleep(0.1)
+    assert backend.take("k", 20.0, 2) == 0.0
+
+
+def test_memory_backend_evicts_idle_buckets():
+    backend = MemoryBucketBackend(max_keys=2)
+    backend.take("a", 1000.0, 1)
+    backend.take("b", 1000.0, 1)
+    time.sleep(0.01)
+    backend.take("c", 1000.0, 1)
+    assert len(backend._buckets) <= 2
+    assert "c" in backend._buckets
+
+
+def test_sqlite_buckets_are_shared_between_instances(tmp_path):
+    path = str(tmp_path / "buckets.db")
+    first, second = SQLiteBucketBackend(path), SQLiteBucketBackend(path)
+    assert first.take("k", 1.0, 2) == 0.0
+    assert second.take("k", 1.0, 2) == 0.0
+    assert first.take("k", 1.0, 2) > 0
+
+
+def test_sqlite_contention_falls_back_to_process_buckets(tmp_path):
+    path = str(tmp_path / "buckets.db")
+    backend = SQLiteBucketBackend(path, busy_timeout=0.01)
+    # Another process holds the write lock for longer than the busy timeout
+    blocker = sqlite3.connect(path, isolation_level=None)
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        results = [backend.take("k", 1.0, 2) for _ in range(3)]
+    finally:
+        blocker.execute("ROLLBACK")
+        blocker.close()
+    # Still limited, not failed open
+    assert results[:2] == [0.0, 0.0]
+    assert results[2] > 0
+    assert backend.fallback_count == 3
+
+
+async def _ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+@pytest.fixture
+def limiter():
+    return RateLimitMiddleware(_ok_app, backend=MemoryBucketBackend(), max_concurrent=10)
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("/api/stocks/history", ("cheap", PRIORITY_NORMAL)),
+    ("/api/stocks/predict", ("expensive", PRIORITY_LOW)),
+    ("/api/stocks/screen/", ("expensive", PRIORITY_LOW)),
+    ("/api/auth/login", ("expensive", PRIORITY_HIGH)),
+    ("/api/users/me", ("cheap", PRIORITY_HIGH)),
+    ("/", ("cheap", PRIORITY_NORMAL)),
+])
+def test_classify(limiter, path, expected):
+    assert limiter.classify(path) == expected
+
+
+def test_identify_prefers_jwt_subject_over_ip(limiter):
+    token = create_access_token({"sub": "alice@example.com"})
+    scope = {"headers": [(b"authorization", f"Bearer {token}".encode())], "client": ("10.0.0.1", 1234)}
+    assert limiter.identify(scope) == "user:alice@example.com"
+
+    scope["headers"] = [(b"authorization", b"Bearer not-a-jwt")]
+    assert limiter.identify(scope) == "ip:10.0.0.1"
+    assert limiter.identify({"headers": [], "client": None}) == "ip:unknown"
+
+
+def test_over_limit_requests_get_429_with_retry_after(limiter, monkeypatch):
+    monkeypatch.setitem(settings.RATE_LIMITS, "expensive", (6, 2))  # 1 token per 10s, burst 2
+    client = TestClient(limiter)
+    assert [client.get("/api/stocks/predict").status_code for _ in range(2)] == [200, 200]
+    response = client.get("/api/stocks/predict")
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "10"
+    assert response.json() == {"detail": "Too many requests"}
+    # Cheap routes and health checks have their own budget
+    assert client.get("/api/stocks/history").status_code == 200
+    assert client.get("/api/health/live").status_code == 200
+
+
+@pytest.mark.parametrize("in_flight, path, status", [
+    (7, "/api/stocks/predict", 200),
+    (8, "/api/stocks/predict", 503),  # low priority shed at 75%
+    (8, "/api/stocks/history", 200),
+    (9, "/api/stocks/history", 503),  # normal priority shed at 90%
+    (9, "/api/auth/login", 200),
+    (10, "/api/auth/login", 503),  # high priority only at the hard limit
+])
+def test_load_shedding_by_priority(limiter, in_flight, path, status):
+    assert PRIORITY_SHED_AT[PRIORITY_LOW] == 0.75
+    limiter.in_flight = in_flight
+    response = TestClient(limiter).get(path)
+    assert response.status_code == status
+    if status == 503:
+        assert response.headers["retry-after"] == "1"
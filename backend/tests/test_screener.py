@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+
+from app.models.screener import FIELD_INDEX, UNIVERSE_FIELDS, TickerUniverse, compute_universe_values
+
+
+def _universe(rows):
+    """Universe from {ticker: {field: value}}; unset fields are NaN"""
+    values = np.full((len(rows), len(UNIVERSE_FIELDS)), np.nan)
+    for i, fields in enumerate(rows.values()):
+        for name, value in fields.items():
+            values[i, FIELD_INDEX[name]] = value
+    universe = TickerUniverse()
+    universe.load(list(rows), values)
+    return universe
+
+
+def _tickers(rows):
+    return [row["ticker"] for row in rows]
+
+
+@pytest.fixture
+def small():
+    return _universe({
+        "AAA": {"close": 10.0, "sma_50": 9.0},
+        "BBB": {"close": 30.0, "sma_50": 5.0},
+        "CCC": {"close": 20.0},  # too little history for sma_50
+        "DDD": {"close": 40.0, "sma_50": 5.0},
+    })
+
+
+@pytest.mark.parametrize("op, value, expected", [
+    ("lt", 6.0, ["BBB", "DDD"]),
+    ("lte", 9.0, ["AAA", "BBB", "DDD"]),
+    ("gt", 5.0, ["AAA"]),
+    ("gte", 5.0, ["AAA", "BBB", "DDD"]),
+    ("eq", 5.0, ["BBB", "DDD"]),
+    # NaN != 5 is true in NumPy, but a missing value must never match
+    ("ne", 5.0, ["AAA"]),
+])
+def test_filters_never_match_missing_values(small, op, value, expected):
+    total, rows, _ = small.screen(filters=[("sma_50", op, value)])
+    assert total == len(expected)
+    assert _tickers(rows) == expected
+
+
+def test_filters_combine(small):
+    total, rows, _ = small.screen(filters=[("close", "gt", 15.0), ("sma_50", "eq", 5.0)])
+    assert total == 2
+    assert _tickers(rows) == ["BBB", "DDD"]
+
+
+def test_sort_order_and_missing_values_last(small):
+    _, rows, _ = small.screen(sort_by="sma_50", descending=True)
+    assert _tickers(rows) == ["AAA", "BBB", "DDD", "CCC"]
+    _, rows, _ = small.screen(sort_by="sma_50", descending=False)
+    assert _tickers(rows) == ["BBB", "DDD", "AAA", "CCC"]
+    assert rows[-1]["sma_50"] is None
+
+
+def test_offset_and_limit(small):
+    total, rows, _ = small.screen(sort_by="close", offset=1, limit=2)
+    assert total == 4
+    assert _tickers(rows) == ["BBB", "CCC"]
+    total, rows, _ = small.screen(sort_by="close", offset=10, limit=2)
+    assert total == 4
+    assert rows == []
+
+
+@pytest.mark.parametrize("descending", [True, False])
+def test_paging_through_tied_keys_returns_each_row_once(descending):
+    rng = np.random.default_rng(7)
+    count = 10_000
+    values = np.full((count, len(UNIVERSE_FIELDS)), np.nan)
+    # Coarse keys: many ties at every page boundary, plus some missing values
+    values[:, FIELD_INDEX["close"]] = rng.integers(0, 20, count)
+    values[rng.choice(count, 50, replace=False), FIELD_INDEX["close"]] = np.nan
+    universe = TickerUniverse()
+    universe.load([f"T{i:05d}" for i in range(count)], values)
+
+    seen = []
+    for offset in range(0, count, 333):
+        _, rows, _ = universe.screen(sort_by="close", descending=descending, offset=offset, limit=333)
+        seen.extend(rows)
+
+    assert len(seen) == count
+    assert len(set(_tickers(seen))) == count
+    # Same order as a full sort by (key, row position), with missing values last
+    closes = values[:, FIELD_INDEX["close"]]
+    keys = np.where(np.isnan(closes), np.inf, -closes if descending else closes)
+    expected = [f"T{i:05d}" for i in np.lexsort((np.arange(count), keys))]
+    assert _tickers(seen) == expected
+
+
+def test_compute_universe_values():
+    closes = np.tile(np.arange(1.0, 61.0), (2, 1))
+    closes[1] *= 2
+    volumes = np.full((2, 60), 1000.0)
+    predictions = np.array([[1.0, 0.7, 0.0, 0.6], [0.0, 0.55, 1.0, 0.8]])
+    values = compute_universe_values(closes, volumes, predictions)
+
+    assert values.shape == (2, len(UNIVERSE_FIELDS))
+    assert values[0, FIELD_INDEX["close"]] == 60.0
+    assert values[0, FIELD_INDEX["change_1d_pct"]] == pytest.approx((60 / 59 - 1) * 100)
+    assert values[0, FIELD_INDEX["sma_20"]] == pytest.approx(np.mean(np.arange(41.0, 61.0)))
+    assert values[1, FIELD_INDEX["sma_50"]] == pytest.approx(2 * np.mean(np.arange(11.0, 61.0)))
+    assert values[0, FIELD_INDEX["avg_volume_20"]] == 1000.0
+    # Prices only rise, so there are no losses
+    assert values[0, FIELD_INDEX["rsi_14"]] == 100.0
+    np.testing.assert_array_equal(values[:, FIELD_INDEX["pred_1d_up"]:], predictions)
+
+
+def test_compute_universe_values_short_history_is_missing():
+    closes = np.tile(np.arange(1.0, 11.0), (1, 1))
+    values = compute_universe_values(closes, np.ones((1, 10)), np.zeros((1, 4)))
+    for name in ("sma_20", "sma_50", "avg_volume_20", "volatility_20"):
+        assert np.isnan(values[0, FIELD_INDEX[name]])
+    assert not np.isnan(values[0, FIELD_INDEX["change_5d_pct"]])
+
+
+def test_load_rejects_misshaped_matrix():
+    with pytest.raises(ValueError):
+        TickerUniverse().load(["A"], np.zeros((1, 3)))
+
+
+def test_screen_endpoint(client):
+    response = client.post("/api/stocks/screen", json={
+        "filters": [{"field": "close", "op": "gt", "value": 0}],
+        "sort": {"field": "close", "order": "asc"},
+        "limit": 3,
+    })
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["total"] == 10
+    closes = [row["close"] for row in body["results"]]
+    assert len(closes) == 3 and closes == sorted(closes)
+
+    response = client.post("/api/stocks/screen", json={"filters": [{"field": "nope", "op": "gt", "value": 0}]})
+    assert response.status_code == 400
+    response = client.post("/api/stocks/screen", json={"sort": {"field": "nope"}})
+    assert response.status_code == 400
@@ -0,0 +1,160 @@
+from datetime import date, datetime, timedelta
+
+from app.db.models import PredictionResult
+from app.models.mock_data import HISTORY_RANGE_DAYS
+
+
+def _add_predictions(db, count, ticker="AAPL", horizon="1d"):
+    # Several rows share each timestamp so the id tie-breaker is exercised
+    base = datetime(2024, 1, 1)
+    rows = [
+        PredictionResult(
+            ticker=ticker,
+            horizon=horizon,
+            prediction_date=base + timedelta(days=i // 3),
+            prediction="up",
+            confidence=0.6,
+            model_name="xgboost"
+        )
+        for i in range(count)
+    ]
+    db.add_all(rows)
+    db.commit()
+    return rows
+
+
+def _walk(client, limit, **params):
+    pages, cursor = [], None
+    while True:
+        query = {"ticker": "aapl", "limit": limit, **params}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get("/api/stocks/predictions", params=query)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        pages.append(page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_prediction_log_pages_cover_every_row_once_newest_first(client, db):
+    rows = _add_predictions(db, 25)
+    _add_predictions(db, 4, horizon="5d")
+    _add_predictions(db, 4, ticker="MSFT")
+
+    pages = _walk(client, 10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    ids = [item["id"] for page in pages for item in page]
+    expected = sorted(rows, key=lambda row: (row.prediction_date, row.id), reverse=True)
+    assert ids == [row.id for row in expected]
+
+
+def test_prediction_log_exact_page_has_no_next_cursor(client, db):
+    _add_predictions(db, 10)
+    pages = _walk(client, 10)
+    assert [len(page) for page in pages] == [10]
+
+
+def test_prediction_log_rows_added_while_paging_do_not_shift_pages(client, db):
+    _add_predictions(db, 6)
+    first = client.get("/api/stocks/predictions", params={"ticker": "AAPL", "limit": 3}).json()
+    # Newer rows land at the head of the log; the cursor keeps its place
+    _add_predictions(db, 3)
+    second = client.get(
+        "/api/stocks/predictions", params={"ticker": "AAPL", "limit": 3, "cursor": first["next_cursor"]}
+    ).json()
+    seen = {item["id"] for item in first["items"]}
+    assert len(second["items"]) == 3
+    assert not seen & {item["id"] for item in second["items"]}
+    assert second["items"][0]["prediction_date"] <= first["items"][-1]["prediction_date"]
+
+
+def test_prediction_log_rejects_bad_input(client, db):
+    assert client.get("/api/stocks/predictions", params={"ticker": "AAPL", "cursor": "nope"}).status_code == 400
+    assert client.get("/api/stocks/predictions", params={"ticker": "AAPL", "horizon": "2d"}).status_code == 400
+    assert client.get("/api/stocks/predictions", params={"ticker": "AAPL", "limit": 0}).status_code == 422
+
+
+def test_history_rejects_unknown_range(client):
+    assert client.get("/api/stocks/history", params={"ticker": "AAPL", "range": "x1"}).status_code == 400
+    assert client.get("/api/stocks/history", params={"ticker": "AAPL", "range": "1m"}).status_code == 200
+
+
+def test_history_start_window(client):
+    start = date.today() - timedelta(days=60)
+    end = date.today() - timedelta(days=30)
+    response = client.get(
+        "/api/stocks/history", params={"ticker": "AAPL", "start": start.isoformat(), "end": end.isoformat()}
+    )
+    assert response.status_code == 200
+    dates = [bar["date"] for bar in response.json()]
+    assert dates and dates == sorted(dates)
+    assert start.isoformat() <= dates[0] and dates[-1] <= end.isoformat()
+
+
+def test_history_rejects_start_before_stored_history(client):
+    too_early = date.today() - timedelta(days=HISTORY_RANGE_DAYS["all"] + 1)
+    response = client.get("/api/stocks/history", params={"ticker": "AAPL", "start": too_early.isoformat()})
+    assert response.status_code == 400
+
+
+def test_mock_generators_are_thread_safe():
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.models.mock_data import generate_mock_bar_series, generate_mock_prediction
+
+    expected = generate_mock_bar_series("AAPL", "1m").to_bytes()
+    expected_prediction = generate_mock_prediction("AAPL", "1d", ["lstm", "xgboost"])
+    # Switch threads as often as possible so shared RNG state would interleave
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(8) as pool:
+            series = list(pool.map(lambda _: generate_mock_bar_series("AAPL", "1m").to_bytes(), range(60)))
+            predictions = list(pool.map(lambda _: generate_mock_prediction("AAPL", "1d", ["lstm", "xgboost"]), range(60)))
+    finally:
+        sys.setswitchinterval(interval)
+    assert all(data == expected for data in series)
+    assert all(prediction == expected_prediction for prediction in predictions)
+
+
+def test_cache_keys_are_resolved_off_the_event_loop(client, monkeypatch):
+    import asyncio
+
+    from app.core.cache import cache
+
+    on_loop = []
+    versioned_key = cache.versioned_key
+
+    def record(*args):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(args)
+        except RuntimeError:
+            pass
+        return versioned_key(*args)
+
+    monkeypatch.setattr(cache, "versioned_key", record)
+    assert client.get("/api/stocks/history", params={"ticker": "AAPL", "range": "1m"}).status_code == 200
+    assert client.get("/api/stocks/history", params={"ticker": "AAPL", "after_date": date.today().isoformat()}).status_code == 200
+    assert client.get("/api/stocks/predict", params={"ticker": "AAPL"}).status_code == 200
+    assert on_loop == []
+
+
+def test_predict_models_are_canonical(client, monkeypatch):
+    from app.core.cache import cache
+
+    keys = []
+    get_or_fill = cache.get_or_fill
+    monkeypatch.setattr(cache, "get_or_fill", lambda key, *args: keys.append(key) or get_or_fill(key, *args))
+
+    first = client.get("/api/stocks/predict", params={"ticker": "AAPL", "models": "xgboost,lstm"})
+    second = client.get("/api/stocks/predict", params={"ticker": "AAPL", "models": "lstm, xgboost,lstm"})
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert len({key for key in keys if not key.endswith(("gzip", "br", "zstd"))}) == 1
+
+    assert client.get("/api/stocks/predict", params={"ticker": "AAPL", "models": "x" * 5000}).status_code == 400
+    assert client.get("/api/stocks/predict", params={"ticker": "AAPL", "models": ","}).status_code == 400